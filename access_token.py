@@ -0,0 +1,149 @@
+"""
+File: access_token.py
+Function: Signed, expiring court-access tokens -- a verified session survives reloads, new tabs and dropped
+          websockets without another verification (or audit-log row) until the token expires
+
+A token is "<base64url(email|expiry)>.<base64url(HMAC-SHA256)>", issued once per successful verification and kept
+in the page URL (?access=...) -- Streamlit can read cookies but not set them. Tokens are checked locally (no
+database). Configured under [access_token] in secrets.toml:
+    secret = "..."                 # server-only signing key (NOT the court security code); no tokens are issued without it
+    ttl_hours = 12                 # one court day
+    enabled = true                 # default
+
+The token is a bearer credential: it travels with every copied, bookmarked or shared URL and works for anyone
+holding it until it expires. Logout revokes the session's token in this process only (other workers keep
+accepting it until expiry); rotating `secret` revokes every token everywhere.
+"""
+
+import base64
+import hashlib
+import hmac
+import threading
+import time
+
+import streamlit as st
+
+import metrics
+
+
+TOKEN_PARAM = "access"
+COURT_EMAIL_DOMAINS = ("@courts.mo.gov", "@jacksongov.org")
+
+
+# Define _b64encode() / _b64decode()
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+# Define _signature()
+def _signature(secret, payload):
+    return hmac.new(str(secret).encode(), payload, hashlib.sha256).digest()
+
+# Define issue_token()
+def issue_token(email, secret, ttl, now=None):
+    """Token for `email`, valid for `ttl` seconds"""
+    expires = int((time.time() if now is None else now) + ttl)
+    payload = f"{email}|{expires}".encode()
+    return f"{_b64encode(payload)}.{_b64encode(_signature(secret, payload))}"
+
+# Define is_court_email()
+def is_court_email(email):
+    """True for addresses on the court-portal domains"""
+    return (email or "").strip().lower().endswith(COURT_EMAIL_DOMAINS)
+
+# Define verify_token()
+def verify_token(token, secret, max_ttl, now=None):
+    """Email the token was issued to, or None if it is malformed, forged, expired or expires beyond now + `max_ttl`"""
+    try:
+        payload_text, signature_text = token.split(".")
+        payload, signature = _b64decode(payload_text), _b64decode(signature_text)
+        email, expires = payload.decode().rsplit("|", 1)
+        expires = int(expires)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not hmac.compare_digest(signature, _signature(secret, payload)):
+        return None
+    now = time.time() if now is None else now
+    if not now < expires <= now + max_ttl:
+        return None
+    return email
+
+
+class RevokedTokens:
+    """Tokens revoked by logout, remembered (per process) until they would have expired anyway"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {} # token digest -> expiry
+
+    def revoke(self, token, expires):
+        with self._lock:
+            now = time.time()
+            for digest, digest_expires in list(self._revoked.items()):
+                if digest_expires <= now:
+                    del self._revoked[digest]
+            self._revoked[hashlib.sha256(token.encode()).digest()] = expires
+
+    def __contains__(self, token):
+        return hashlib.sha256(token.encode()).digest() in self._revoked
+
+
+# --- Session helpers ---
+
+# Define token_settings()
+def token_settings():
+    """(signing secret, ttl seconds), or None when tokens are disabled or no [access_token] secret is configured"""
+    token_config = st.secrets.get("access_token", {})
+    if not token_config.get("enabled", True) or not token_config.get("secret"):
+        return None
+    return token_config["secret"], float(token_config.get("ttl_hours", 12)) * 3600
+
+# Define get_revoked_tokens()
+@st.cache_resource
+def get_revoked_tokens():
+    return RevokedTokens()
+
+# Define grant_access_token()
+def grant_access_token(email):
+    """Issue a token for a freshly verified `email` and put it in the URL"""
+    settings = token_settings()
+    if settings is None:
+        return
+    st.session_state["access_token"] = issue_token(email, *settings)
+    st.query_params[TOKEN_PARAM] = st.session_state["access_token"]
+    metrics.increment("access_token.issued")
+
+# Define restore_access_token()
+def restore_access_token():
+    """Email of a valid token in the URL (the session is verified without the portal); None otherwise"""
+    token = st.query_params.get(TOKEN_PARAM)
+    if not token:
+        return None
+    settings = token_settings()
+    email = verify_token(token, *settings) if settings is not None else None
+    if email is None or not is_court_email(email) or token in get_revoked_tokens():
+        del st.query_params[TOKEN_PARAM] # Expired / revoked: back to the portal with a clean URL
+        metrics.increment("access_token.rejected")
+        return None
+    st.session_state["access_token"] = token
+    metrics.increment("access_token.restored")
+    return email
+
+# Define keep_access_token()
+def keep_access_token():
+    """Put the session's token back in the URL (page navigation clears query parameters)"""
+    token = st.session_state.get("access_token")
+    if token and st.query_params.get(TOKEN_PARAM) != token:
+        st.query_params[TOKEN_PARAM] = token
+
+# Define revoke_access_token()
+def revoke_access_token():
+    """Logout: revoke the session's token (this process), forget the session and drop the token from the URL"""
+    token = st.session_state.get("access_token")
+    settings = token_settings()
+    if token and settings is not None:
+        get_revoked_tokens().revoke(token, time.time() + settings[1]) # Remembered for the longest a token can live
+    st.session_state.clear()
+    st.query_params.pop(TOKEN_PARAM, None)
@@ -0,0 +1,43 @@
+"""
+File: admin_metrics.py
+Function: Admin-only Streamlit page with the directory's timing spans, counters and component stats
+"""
+
+import streamlit as st
+import pandas as pd
+
+import metrics
+
+
+# Only reachable through st.navigation for [metrics] admin_emails, but check again in case the URL is opened directly
+if not metrics.is_metrics_admin(st.session_state.get("verified_user")):
+    st.error("You are not authorized to view this page.")
+    st.stop()
+
+st.markdown("<h1 style='text-align: center; color: black;'>Directory Metrics</h1>", unsafe_allow_html=True)
+st.divider()
+
+metrics_snapshot = metrics.snapshot()
+
+# Timing spans (DB vs. rendering cost)
+st.subheader("Timing spans")
+if metrics_snapshot["spans"]:
+    spans_df = pd.DataFrame.from_dict(metrics_snapshot["spans"], orient="index").round(2)
+    st.dataframe(spans_df, use_container_width=True)
+else:
+    st.write("No spans recorded yet.")
+
+# Counters
+st.subheader("Counters")
+st.dataframe(pd.Series(metrics_snapshot["counters"], name="count", dtype=float), use_container_width=True)
+
+# Pools / caches / queues
+st.subheader("Components")
+for component, stats in metrics_snapshot["components"].items():
+    st.write(f"**{component}**")
+    st.dataframe(pd.Series(stats, name="value", dtype=float).to_frame().T, hide_index=True, use_container_width=True)
+
+with st.expander("Prometheus text"):
+    st.code(metrics.prometheus_text(), language="text")
+
+st.button("Refresh", icon="🔄", key="metrics_refresh")
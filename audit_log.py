@@ -0,0 +1,161 @@
+"""
+File: audit_log.py
+Function: Background, batched writer for the verification audit logs (courts_log / police_log)
+"""
+
+import atexit
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+
+import streamlit as st
+import psycopg2
+from psycopg2 import pool
+
+import metrics
+from database import insert_log_rows
+
+
+class AuditLogWriter:
+    """Queue audit-log rows in memory and INSERT them in batches from a background thread.
+
+    log() never touches the database: it enqueues (or, if the bounded queue is full, drops and counts) the row.
+    The writer flushes a multi-row INSERT per table whenever `batch_size` rows are waiting or `flush_interval`
+    seconds have passed, and drains whatever is left on shutdown.
+    """
+
+    def __init__(self, connection_pool, batch_size=100, flush_interval=2.0, max_queue=10000, max_retries=3):
+        self._pool = connection_pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._flush_seconds = [] # Recent flush latencies (bounded)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- Public API ---
+
+    def log(self, db_table_name, user_email, user_ip):
+        """Enqueue one activity row; returns False (and counts a drop) if the queue is full or the writer is closed"""
+        if self._stopping.is_set():
+            self._count("dropped")
+            return False
+        try:
+            self._queue.put_nowait((db_table_name, (user_email, user_ip)))
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("enqueued")
+        return True
+
+    def close(self, timeout=10.0):
+        """Stop accepting rows and flush everything still queued"""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def stats(self):
+        """enqueued / dropped / flushed / flushes / flush_errors counters, queue depth and flush latency (ms)"""
+        with self._lock:
+            stats = dict(self._counters)
+            latencies = sorted(self._flush_seconds)
+        stats["queued"] = self._queue.qsize()
+        if latencies:
+            stats["flush_ms_p50"] = latencies[len(latencies) // 2] * 1000
+            stats["flush_ms_max"] = latencies[-1] * 1000
+        return stats
+
+    # --- Background thread ---
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _run(self):
+        batch = [] # (db_table_name, row, failed attempts)
+        deadline = time.monotonic() + self.flush_interval
+        while not self._stopping.is_set():
+            try:
+                db_table_name, row = self._queue.get(timeout=max(0.0, min(deadline - time.monotonic(), 0.5)))
+                batch.append((db_table_name, row, 0))
+            except queue.Empty:
+                pass
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                batch = self._flush(batch)
+                deadline = time.monotonic() + self.flush_interval
+        # Shutdown: drain everything still queued and write it in batch_size chunks, one attempt each
+        while True:
+            try:
+                db_table_name, row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append((db_table_name, row, 0))
+        self._flush(batch, final=True)
+
+    def _flush(self, batch, final=False):
+        """Write `batch` in batch_size chunks; returns the rows that should be retried on the next flush"""
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            if not self._write(chunk):
+                # Database unavailable: keep the rest (not attempted) for the next flush, or drop it on shutdown
+                untried = batch[start + self.batch_size:]
+                if final:
+                    self._count("dropped", len(chunk) + len(untried))
+                    return []
+                return self._retry(chunk) + untried
+        return []
+
+    def _write(self, chunk):
+        """One multi-row INSERT per table for `chunk`; False if it failed"""
+        by_table = defaultdict(list)
+        for db_table_name, row, failures in chunk:
+            by_table[db_table_name].append(row)
+
+        start = time.perf_counter()
+        try:
+            with self._pool.connection() as conn:
+                for db_table_name, rows in by_table.items():
+                    insert_log_rows(conn, db_table_name, rows)
+                conn.commit()
+        except (psycopg2.Error, pool.PoolError) as e:
+            self._count("flush_errors")
+            print(f"Audit log flush failed ({len(chunk)} rows): {e}")
+            return False
+
+        flush_seconds = time.perf_counter() - start
+        metrics.record("db.audit_flush", flush_seconds)
+        with self._lock:
+            self._counters["flushed"] += len(chunk)
+            self._counters["flushes"] += 1
+            self._flush_seconds = self._flush_seconds[-99:] + [flush_seconds]
+        return True
+
+    def _retry(self, chunk):
+        """Rows of a failed chunk with attempts left -- each row counts its own failures, so rows queued after
+        an outage began are not dropped with the batch that has been failing"""
+        retry = [(db_table_name, row, failures + 1) for db_table_name, row, failures in chunk if failures + 1 < self.max_retries]
+        if len(retry) < len(chunk):
+            self._count("dropped", len(chunk) - len(retry))
+        return retry
+
+
+# Define get_audit_log_writer()
+@st.cache_resource
+def get_audit_log_writer(_connection_pool):
+    """Process-wide AuditLogWriter; batching is configurable under [audit_log] in secrets.toml"""
+    log_config = st.secrets.get("audit_log", {})
+    audit_log_writer = AuditLogWriter(
+        _connection_pool,
+        batch_size=log_config.get("batch_size", 100),
+        flush_interval=log_config.get("flush_interval", 2.0),
+        max_queue=log_config.get("max_queue", 10000),
+    )
+    metrics.register_collector("audit_log", audit_log_writer.stats)
+    return audit_log_writer
@@ -0,0 +1,233 @@
+"""
+File: benchmarks/bench_court_directory.py
+Function: Headless multi-session load test for the court directory (Streamlit AppTest + synthetic roster / fake pool)
+
+Drives streamlit_app.py (verification) and court_view.py (filters, search, Main/Contact views) for N concurrent
+sessions, then reports p50/p95/p99 rerun latency per action, pool checkout waits and peak RSS. Exits non-zero
+when a metric exceeds its threshold (benchmarks/thresholds.json, or --thresholds).
+
+AppTest swaps process-global state (runtime, secrets) on every run, so the sessions' reruns are interleaved
+one at a time rather than truly parallel; shared caches and background threads (audit-log writer, roster
+refresh) are exercised exactly as in the server. Latencies exclude the time a session waits for its turn.
+AppTest reruns the whole script even for widgets inside st.fragment, so directory interactions are measured as
+full reruns (an upper bound for the fragment-only reruns a browser session gets).
+
+Because of that serialization the rerun phase never contends for the pool, so a second, truly concurrent backend
+phase follows: --backend-threads threads (no lock) hammer the app's shared RosterCache.get, AuditLogWriter.log and
+pool checkouts (one simulated query each). Its checkout waits are the ones reported and gated.
+
+    python benchmarks/bench_court_directory.py --sessions 20 --roster-size 1000
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT) # Asset paths in the app are relative to the repo root
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+import streamlit as st
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+from synthetic import FakePool, install_fakes, make_roster, UNITS, LOCATIONS
+
+
+COURT_CODE = "bench-code"
+SEARCHES = ["smith", "jon", "garcia", "willaims", "mar", "lee"]
+SCRATCH_DIR = tempfile.mkdtemp(prefix="court-directory-bench-")
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+
+SECRETS = {
+    "neonDB": {"database_url": "postgresql://benchmark"},
+    "cloudinary": {"CLOUD_NAME": "benchmark", "API_KEY": "key", "API_SECRET": "secret"},
+    "security_codes": {"court": COURT_CODE},
+    # Persisted roster + headshot manifest go to a scratch directory, never the repo's .cache/roster (which a
+    # later run, or a dev `streamlit run`, would otherwise adopt as the real roster)
+    "roster": {"persist_dir": SCRATCH_DIR},
+}
+
+_app_lock = threading.Lock() # One AppTest run at a time (see module docstring)
+
+
+# Define install_secrets()
+def install_secrets():
+    """Process-wide secrets for every simulated session (AppTest's per-instance secrets are not thread-safe)"""
+    st.secrets = Secrets()
+    st.secrets._secrets = SECRETS
+
+
+# Define run_session()
+def run_session(session_id, actions, timings, errors, timeout):
+    """One simulated court user: verify, then a random mix of filter / search / view interactions"""
+    rnd = random.Random(session_id)
+
+    def timed(action, step):
+        with _app_lock:
+            start = time.perf_counter()
+            at = step()
+            timings[action].append(time.perf_counter() - start)
+        if at.exception:
+            errors.append((session_id, action, at.exception[0].message))
+
+    at = AppTest.from_file("streamlit_app.py", default_timeout=timeout)
+    timed("verification_portal", at.run)
+    at.text_input(key="verified_email").input(f"clerk{session_id}@courts.mo.gov")
+    at.text_input(key="security_code").input(COURT_CODE)
+    timed("verify", at.button[0].click().run)
+
+    for _ in range(actions):
+        action = rnd.choice(["position", "unit", "location", "search", "contact_view", "main_view", "reset"])
+        if action == "position":
+            timed(action, at.selectbox(key="selected_position").set_value(rnd.choice(["All", "Exec", "CTA", "TTL", "APA"])).run)
+        elif action == "unit":
+            timed(action, at.selectbox(key="selected_unit").set_value(rnd.choice(["All"] + UNITS)).run)
+        elif action == "location":
+            timed(action, at.selectbox(key="selected_location").set_value(rnd.choice(["All"] + LOCATIONS)).run)
+        elif action == "search" and at.session_state["view"] == "Main Directory":
+            at.text_input(key="searched_text").input(rnd.choice(SEARCHES))
+            timed(action, at.button(key="text_search").click().run)
+        elif action == "contact_view":
+            timed(action, at.selectbox(key="directory_view").set_value("Contact Directory").run)
+        elif action == "main_view":
+            timed(action, at.selectbox(key="directory_view").set_value("Main Directory").run)
+        elif action == "reset":
+            timed(action, at.button(key="filter_reset").click().run)
+
+
+# Define run_backend_worker()
+def run_backend_worker(worker_id, operations, roster_cache, audit_log_writer, fake_pool, timings, errors):
+    """Concurrent backend load (no _app_lock): roster reads, audit-log enqueues and pool checkouts"""
+    rnd = random.Random(10_000 + worker_id)
+    local_timings = defaultdict(list)
+    for _ in range(operations):
+        action = rnd.choice(["roster_get", "audit_log", "db_query"])
+        start = time.perf_counter()
+        try:
+            if action == "roster_get":
+                roster_cache.get()
+            elif action == "audit_log":
+                audit_log_writer.log("courts_log", f"clerk{worker_id}@courts.mo.gov", "127.0.0.1")
+            else:
+                with fake_pool.connection():
+                    time.sleep(fake_pool.latency)
+        except Exception as e:
+            errors.append((f"backend-{worker_id}", action, repr(e)))
+        local_timings[action].append(time.perf_counter() - start)
+    for action, samples in local_timings.items():
+        timings[action].extend(samples)
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1000
+    return {"n": len(values), "p50": np.percentile(values, 50), "p95": np.percentile(values, 95), "p99": np.percentile(values, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent simulated sessions")
+    parser.add_argument("--actions", type=int, default=20, help="interactions per session after verification")
+    parser.add_argument("--roster-size", type=int, default=300, help="synthetic attorneys in the roster")
+    parser.add_argument("--pool-size", type=int, default=10, help="fake pool max connections")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="simulated latency per DB call")
+    parser.add_argument("--backend-threads", type=int, help="threads in the concurrent backend phase (default: 2 x pool size)")
+    parser.add_argument("--backend-ops", type=int, default=50, help="operations per backend thread")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-rerun AppTest timeout (s)")
+    parser.add_argument("--thresholds", type=Path, default=Path(__file__).with_name("thresholds.json"))
+    parser.add_argument("--json", type=Path, help="also write the report as JSON")
+    args = parser.parse_args()
+
+    fake_pool = FakePool(max_size=args.pool_size, latency=args.db_latency_ms / 1000)
+    install_fakes(make_roster(args.roster_size), fake_pool)
+    install_secrets()
+
+    timings, errors = defaultdict(list), []
+    start = time.perf_counter()
+    sessions = [
+        threading.Thread(target=run_session, args=(i, args.actions, timings, errors, args.timeout))
+        for i in range(args.sessions)
+    ]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    elapsed = time.perf_counter() - start
+
+    # Concurrent backend phase: the app's process-wide roster cache / audit-log writer, built by the sessions above
+    import database
+    from audit_log import get_audit_log_writer
+
+    roster_cache, audit_log_writer = database.get_roster_cache(fake_pool), get_audit_log_writer(fake_pool)
+    backend_timings = defaultdict(list)
+    rerun_checkouts = len(fake_pool.checkout_waits)
+    backend_threads = args.backend_threads or 2 * args.pool_size
+    workers = [
+        threading.Thread(target=run_backend_worker, args=(i, args.backend_ops, roster_cache, audit_log_writer, fake_pool, backend_timings, errors))
+        for i in range(backend_threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    checkout_waits = fake_pool.checkout_waits[rerun_checkouts:]
+
+    report = {
+        "sessions": args.sessions,
+        "roster_size": args.roster_size,
+        "elapsed_s": elapsed,
+        "rerun_ms": {action: percentiles(samples) for action, samples in sorted(timings.items())},
+        "all_reruns_ms": percentiles([sample for samples in timings.values() for sample in samples]),
+        "backend_threads": backend_threads,
+        "backend_ms": {action: percentiles(samples) for action, samples in sorted(backend_timings.items())},
+        "pool_checkout_wait_ms": percentiles(checkout_waits or [0.0]),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, # KB on Linux
+        "errors": errors[:20],
+    }
+
+    print(f"{args.sessions} sessions x {args.actions} actions, roster of {args.roster_size}: {elapsed:.1f}s")
+    print(f"{'action':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for action, stats in list(report["rerun_ms"].items()) + [("ALL", report["all_reruns_ms"])]:
+        print(f"{action:<22}{stats['n']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+    print(f"backend phase, {backend_threads} concurrent threads:")
+    for action, stats in list(report["backend_ms"].items()) + [("pool checkout wait", report["pool_checkout_wait_ms"])]:
+        print(f"{action:<22}{stats['n']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}")
+    print(f"peak RSS: {report['peak_rss_mb']:.0f} MB, errors: {len(errors)}")
+    for error in errors[:5]:
+        print("  ", error)
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, default=float))
+
+    # Regression thresholds
+    failures = []
+    thresholds = json.loads(args.thresholds.read_text()) if args.thresholds.exists() else {}
+    checks = {
+        "rerun_p95_ms": report["all_reruns_ms"]["p95"],
+        "rerun_p99_ms": report["all_reruns_ms"]["p99"],
+        "pool_checkout_wait_p95_ms": report["pool_checkout_wait_ms"]["p95"],
+        "peak_rss_mb": report["peak_rss_mb"],
+        "errors": len(errors),
+    }
+    for name, value in checks.items():
+        if name in thresholds and value > thresholds[name]:
+            failures.append(f"{name} = {value:.1f} exceeds threshold {thresholds[name]}")
+    for failure in failures:
+        print("REGRESSION:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+File: benchmarks/bench_formatting.py
+Function: Microbenchmark of the directory display formatting -- vectorized lookup-table transforms
+          (directory.format_*) vs. the previous per-row .apply() functions, on a synthetic roster
+
+Also checks that both produce identical Badge / Location Label / Phone Number / Phone Display columns.
+
+    python benchmarks/bench_formatting.py --roster-size 5000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd
+
+from directory import format_badges, format_locations, format_phone_numbers, parse_enum
+from synthetic import make_roster
+
+
+# --- Previous per-row implementations (baseline) ---
+
+def legacy_configure_badge(row):
+    if row['Assigned Unit']:
+        unit = ' / '.join(row['Assigned Unit'])
+    else:
+        unit = 'N/A'
+    if 'Drug' in unit:
+        unit = unit.replace("Drug", "Drug Court")
+    if row['Position'] == 'Exec':
+        if row['Position'] == unit:
+            position_badge = f":red-badge[**Executive Staff**]"
+        else:
+            position_badge = f":red-badge[**Executive Staff - {unit}**]"
+    elif row['Position'] == 'CTA':
+        position_badge = f":orange-badge[**Chief Trial Attorney - {unit}**]"
+    elif row['Position'] == 'TTL':
+        position_badge = f":green-badge[**Trial Team Leader - {unit}**]"
+    elif row['Position'] == 'APA':
+        position_badge = f":blue-badge[**Assistant Prosecuting Attorney - {unit}**]"
+    return position_badge
+
+LEGACY_LOCATIONS = {
+    'Dt-11': "Downtown Courthouse, 11th floor",
+    'Dt-10': "Downtown Courthouse, 10th floor",
+    'Dt-9': "Downtown Courthouse, 9th floor (COMBAT)",
+    'Dt-7M': "Downtown Courthouse, 7M",
+    'Indy': "Eastern Jackson Courthouse, Independence",
+    'FSD': "Family Support Division",
+}
+
+def legacy_reformat_location(row):
+    return LEGACY_LOCATIONS[row['Office Location']] # if/elif chain (unbound for unknown codes)
+
+def legacy_reformat_phone_num(phone_num):
+    if not isinstance(phone_num, str) or pd.isna(phone_num):
+        return phone_num
+    if len(phone_num) == 10:
+        return f"{phone_num[:3]}-{phone_num[3:6]}-{phone_num[6:]}"
+    return phone_num
+
+def legacy_reformat_work_phone(phone_num):
+    work_phone = legacy_reformat_phone_num(phone_num)
+    if str(phone_num).startswith("816881"):
+        return f"{work_phone} (ext. {str(phone_num)[-4:]})"
+    return work_phone
+
+
+def legacy_format(df):
+    return pd.DataFrame({
+        'Badge': df.apply(legacy_configure_badge, axis=1),
+        'Location Label': df.apply(legacy_reformat_location, axis=1),
+        'Phone Number': df['Work Phone #'].apply(legacy_reformat_phone_num),
+        'Phone Display': df['Work Phone #'].apply(legacy_reformat_work_phone),
+    })
+
+def vectorized_format(df):
+    phone_number, phone_display = format_phone_numbers(df['Work Phone #'])
+    return pd.DataFrame({
+        'Badge': format_badges(df['Position'], df['Assigned Unit']),
+        'Location Label': format_locations(df['Office Location']),
+        'Phone Number': phone_number,
+        'Phone Display': phone_display,
+    })
+
+
+def best_of(function, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roster-size", type=int, default=5000, help="synthetic attorneys in the roster")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    df = make_roster(args.roster_size)
+    df['Assigned Unit'] = df['Assigned Unit'].apply(parse_enum).apply(tuple)
+    df['Position'] = df['Position'].astype('category')
+    df['Office Location'] = df['Office Location'].astype('category')
+
+    legacy_ms, expected = best_of(legacy_format, df, args.repeat)
+    vectorized_ms, result = best_of(vectorized_format, df, args.repeat)
+
+    print(f"roster of {args.roster_size}: per-row .apply {legacy_ms:.1f} ms, vectorized {vectorized_ms:.1f} ms ({legacy_ms / vectorized_ms:.1f}x)")
+    mismatches = (expected.astype(object).fillna("<None>") != result.astype(object).fillna("<None>")).sum()
+    print("mismatched values per column:", mismatches.to_dict())
+    sys.exit(1 if mismatches.any() else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+File: benchmarks/synthetic.py
+Function: Synthetic APA roster + in-process database stand-in (fake pool) for the court directory benchmarks
+"""
+
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+               "Daniel", "Maria", "Matthew", "Nancy", "Anthony", "Lisa", "Mark", "Betty", "Steven", "Ashley"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+              "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson"]
+POSITIONS = ["Exec", "CTA", "TTL", "APA", "APA", "APA", "APA"]
+UNITS = ["Exec", "GCU", "SVU", "VCU", "CSU", "Drug", "FSD"]
+LOCATIONS = ["Dt-11", "Dt-10", "Dt-7M", "Indy", "FSD"]
+JOB_TITLES = {"Exec": "Chief Deputy", "CTA": "Chief Trial Attorney", "TTL": "Trial Team Leader", "APA": "Assistant Prosecuting Attorney"}
+
+
+# Define make_roster()
+def make_roster(size=300, seed=0):
+    """employee_info_view-shaped DataFrame with `size` attorneys (enum arrays as '{a,b}' strings, like RealDictCursor)"""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(size):
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        middle = rnd.choice([None, None, rnd.choice(FIRST_NAMES)])
+        suffix = rnd.choice([None] * 12 + ["Jr.", "III"])
+        position = rnd.choice(POSITIONS)
+        units = rnd.sample(UNITS, rnd.choice([0, 1, 1, 1, 2]))
+        rows.append({
+            "Employee ID": i,
+            "Full Name": " ".join(part for part in (first, middle, last, suffix) if part),
+            "First Name": first,
+            "Middle Name": middle,
+            "Last Name": last,
+            "Suffix": suffix,
+            "Preferred Name": rnd.choice([None] * 8 + [first[:3]]),
+            "Job Title": JOB_TITLES[position],
+            "Position": position,
+            "Assigned Unit": "{" + ",".join(units) + "}",
+            "Race": "{}",
+            "Office Location": rnd.choice(LOCATIONS),
+            "Work Email Address": f"{first}.{last}{i}@jacksongov.org".lower(),
+            "Work Phone #": rnd.choice([f"816881{rnd.randrange(10000):04d}", f"816{rnd.randrange(10**7):07d}", None]),
+            "PhotoID": rnd.choice([None, f"headshot_{i}.jpg"]),
+        })
+    return pd.DataFrame(rows).sort_values("Last Name", kind="stable").reset_index(drop=True)
+
+
+# --- Database stand-in ---
+
+class FakeConnection:
+    class info:
+        backend_pid = 0
+
+    closed = 0
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    """Stands in for DirectoryConnectionPool: bounded checkout (records wait times) with simulated query latency"""
+
+    def __init__(self, max_size=10, latency=0.005):
+        self.latency = latency
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.checkout_waits = []
+
+    @contextmanager
+    def connection(self, timeout=None):
+        start = time.perf_counter()
+        self._slots.acquire()
+        with self._lock:
+            self.checkout_waits.append(time.perf_counter() - start)
+        try:
+            yield FakeConnection()
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        pass
+
+
+# --- Cloudinary Admin API stand-in ---
+
+class FakeResourceListing:
+    """Stands in for cloudinary.api.resources: pages (next_cursor) over one uploaded image per roster PhotoID"""
+
+    def __init__(self, roster, latency=0.05):
+        self.latency = latency
+        self.calls = 0
+        rnd = random.Random(1)
+        self._resources = [
+            {"public_id": f"JCPAO_headshots/{photo_id.rsplit('.', 1)[0]}", "version": 1700000000 + rnd.randrange(10**7),
+             "width": rnd.choice([600, 800, 1200]), "height": rnd.choice([750, 1000, 1500]), "format": "jpg"}
+            for photo_id in roster["PhotoID"].dropna()
+        ]
+
+    def __call__(self, type="upload", resource_type="image", prefix="", max_results=10, next_cursor=None, **options):
+        time.sleep(self.latency)
+        self.calls += 1
+        matching = [resource for resource in self._resources if resource["public_id"].startswith(prefix)]
+        start = int(next_cursor or 0)
+        page = {"resources": matching[start:start + max_results]}
+        if start + max_results < len(matching):
+            page["next_cursor"] = str(start + max_results)
+        return page
+
+
+# Define install_fakes()
+def install_fakes(roster, fake_pool):
+    """Route the app's database access (roster load/version check, audit-log inserts) to `fake_pool` / `roster`,
+    and the headshot manifest's Cloudinary listing to a FakeResourceListing"""
+    import database
+    import audit_log
+    import headshots
+
+    roster = roster.copy()
+    roster["_row_hash"] = [hashlib.md5(str(row).encode()).hexdigest() for row in roster.itertuples(index=False)]
+    version = hashlib.md5("".join(sorted(roster["_row_hash"])).encode()).hexdigest()
+
+    def fetch_roster_version(conn):
+        time.sleep(fake_pool.latency)
+        return version
+
+    def fetch_row_hashes(conn, key_column):
+        time.sleep(fake_pool.latency)
+        return dict(zip(roster[key_column], roster["_row_hash"]))
+
+    def load_apa_data(conn, keys=None, key_column=None, batch_size=1000):
+        time.sleep(fake_pool.latency)
+        rows = roster if keys is None else roster[roster[key_column].isin(keys)]
+        return rows[database.ROSTER_COLUMNS + ["_row_hash"]].copy()
+
+    def insert_log_rows(conn, db_table_name, rows):
+        time.sleep(fake_pool.latency)
+
+    database.get_database_session = lambda database_url: fake_pool
+    database.fetch_roster_version = fetch_roster_version
+    database.fetch_row_hashes = fetch_row_hashes
+    database.load_apa_data = load_apa_data
+    audit_log.insert_log_rows = insert_log_rows
+    headshots.cloudinary_resources = FakeResourceListing(roster)
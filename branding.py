@@ -0,0 +1,98 @@
+"""
+File: branding.py
+Function: Pre-generated, right-sized JCPAO branding assets (favicon, sidebar logo, portal logo, placeholder headshot)
+          served by Streamlit static file serving ([server] enableStaticServing in .streamlit/config.toml)
+
+Assets are referenced by URL with a ?v=<content hash> suffix, so browsers cache them long-term (Tornado serves
+versioned static URLs with a 10-year max-age) and fetch each one once. Regenerate after changing the source logo:
+    python branding.py
+"""
+
+import hashlib
+import json
+import sys
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urljoin
+
+import streamlit as st
+
+
+SOURCE_LOGO = Path("assets/logo/jcpao_logo_750x750.png")
+STATIC_DIR = Path("static/branding")
+STATIC_URL = "app/static/branding" # Relative to the app URL
+MANIFEST = STATIC_DIR / "manifest.json"
+
+# name -> (file, square size in px). The placeholder headshot IS the logo, so it shares the logo variants.
+ASSETS = {
+    "favicon": ("favicon-48.png", 48),
+    "logo_96": ("logo-96.webp", 96), # Sidebar logo (st.logo size="large" is 32 CSS px high; 3x for HiDPI)
+    "logo_200": ("logo-200.webp", 200),
+    "logo_400": ("logo-400.webp", 400),
+    "logo_750": ("logo-750.webp", 750),
+}
+# Display width (CSS px) -> (1x, 2x) variants offered via srcset
+LOGO_VARIANTS = {
+    200: ("logo_200", "logo_400"), # Verification portal
+    400: ("logo_400", "logo_750"), # Placeholder headshot (HEADSHOT_WIDTH)
+}
+
+
+# --- Asset URLs ---
+
+# Define load_manifest()
+@lru_cache(maxsize=1)
+def load_manifest():
+    """{asset name: {"file", "version"}} written by build_assets()"""
+    return json.loads(MANIFEST.read_text())
+
+# Define asset_path()
+def asset_path(name):
+    """Local path of a generated asset"""
+    return STATIC_DIR / load_manifest()[name]["file"]
+
+# Define asset_url()
+def asset_url(name, absolute=False):
+    """Versioned static URL of an asset; `absolute` resolves it against the browser's app URL (for st.logo etc.)"""
+    asset = load_manifest()[name]
+    url = f"{STATIC_URL}/{asset['file']}?v={asset['version']}"
+    if absolute:
+        app_url = st.context.url
+        if not app_url: # No browser session (e.g. headless tests): fall back to the local file
+            return str(asset_path(name))
+        return urljoin(app_url, url) # Resolved the way the browser resolves the relative URL in markdown
+    return url
+
+# Define logo_img_tag()
+def logo_img_tag(width, lazy=True, style=None):
+    """<img> HTML of the JCPAO logo at `width` CSS px (a LOGO_VARIANTS width), with its 2x variant in srcset"""
+    normal, hidpi = LOGO_VARIANTS[width]
+    style = style or f"width: 100%; max-width: {width}px;"
+    loading = " loading='lazy' decoding='async'" if lazy else ""
+    return f"<img src='{asset_url(normal)}' srcset='{asset_url(normal)} 1x, {asset_url(hidpi)} 2x' alt='JCPAO logo'{loading} style='{style}'>"
+
+# --- Asset pipeline ---
+
+# Define build_assets()
+def build_assets(source=SOURCE_LOGO):
+    """Resize / compress the source logo into every variant in ASSETS and write the manifest"""
+    from PIL import Image
+
+    STATIC_DIR.mkdir(parents=True, exist_ok=True)
+    logo = Image.open(source).convert("RGBA")
+    manifest = {}
+    for name, (file_name, size) in ASSETS.items():
+        variant = logo.resize((size, size), Image.LANCZOS)
+        path = STATIC_DIR / file_name
+        if path.suffix == ".webp":
+            variant.save(path, "WEBP", quality=80, method=6)
+        else:
+            variant.quantize(256, method=Image.FASTOCTREE).save(path, "PNG", optimize=True) # Palette PNG favicon
+        manifest[name] = {"file": file_name, "version": hashlib.md5(path.read_bytes()).hexdigest()[:10]}
+        print(f"{path}: {path.stat().st_size / 1024:.1f} KB")
+    MANIFEST.write_text(json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+if __name__ == "__main__":
+    build_assets(Path(sys.argv[1]) if len(sys.argv) > 1 else SOURCE_LOGO)
@@ -6,19 +6,27 @@ Date: April 30, 2025
 """
 
 import streamlit as st
-from pathlib import Path 
-import pandas as pd
+import time
+import numpy as np
 
 # from initialize_st import initialize_session_state
-from database import get_database_session, get_apa_data
-from photo import load_photo
+import psycopg2
+from psycopg2 import pool
 
+import metrics
+from database import get_database_session
+from directory import get_directory_snapshot, query_directory, positions_dict, units_dict, locations_dict
+from directory_sql import get_directory_query
+from exports import get_contact_table, build_contact_export
+from photo import HEADSHOT_WIDTH, photo_img_tag, load_photo_bytes
+from access_token import revoke_access_token
+from headshots import get_headshot_manifest, headshot_display_size, headshot_public_id
+from branding import asset_url, logo_img_tag
 
-# --- Configure Streamlit page settings --- 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
 
-# --- JCPAO Streamlit page logo --- 
-st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
+# --- Configure Streamlit page settings --- 
+# --- JCPAO Streamlit page logo (static, browser-cached; see branding.py) --- 
+st.logo(asset_url("logo_96", absolute=True), size="large", link="https://www.jacksoncountyprosecutor.com")
 
 # Establish NEON database connection (via psycopg2)
 database_url = st.secrets["neonDB"]["database_url"]
@@ -29,15 +37,33 @@ except Exception as e:
     print(f"{e}")
     st.stop()
 
-def parse_enum(array):
-    if pd.isna(array):
-        return []
-    array = array.strip('{}')
-    return array.split(',') if array else []
+# Data-access mode: "memory" (shared roster snapshot, filtered in-process) or "sql" (filters/search pushed into Postgres)
+QUERY_MODE = st.secrets.get("directory", {}).get("query_mode", "memory")
+
+# Define fetch_directory()
+def fetch_directory(position='All', unit='All', location='All', searched_text=''):
+    """SQL query mode: display-ready matching rows, or None (with an error shown) if the query failed"""
+    try:
+        return query_directory(get_directory_query(db_connection), position, unit, location, searched_text)
+    except (psycopg2.Error, pool.PoolError) as e:
+        st.error(f"Problem with loading data: {e}")
+        return None
+
+# Define load_directory()
+def load_directory():
+    """(Re)bind the shared snapshot -- at the start of every (full or fragment-only) directory run"""
+    global directory_snapshot, apa_data
+    if QUERY_MODE == "sql":
+        directory_snapshot = None
+        apa_data = None # Rows are fetched per filter key (see current_selection())
+        return
 
-apa_data = get_apa_data(db_connection) # "emp_view" / apa_data
-apa_data['Assigned Unit'] = apa_data['Assigned Unit'].apply(parse_enum) # unit_enum[]
-apa_data['Race'] = apa_data['Race'].apply(parse_enum) # race_enum[]
+    # Shared, display-ready roster (enums parsed, badges/locations/phones pre-formatted) -- READ-ONLY
+    directory_snapshot = get_directory_snapshot(db_connection)
+    if directory_snapshot is None:
+        st.stop()
+
+    apa_data = directory_snapshot.data # "emp_view" / apa_data
 
 
 # --- Initialize session state --- 
@@ -58,28 +84,78 @@ if "searched_text" not in st.session_state: # 'search_name'
 if "view" not in st.session_state:
     st.session_state["view"] = "Main Directory"
 
+# Main Directory pagination (page size configurable under [directory] in secrets.toml)
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+# Kept under a non-widget key: the "page_size" selectbox is not drawn in the Contact view, so Streamlit drops its
+# state, and a fragment-only rerun back to the Main view never reaches this page-level initialization
+if "directory_page_size" not in st.session_state:
+    st.session_state["directory_page_size"] = st.secrets.get("directory", {}).get("page_size", 25)
+
+if "directory_page" not in st.session_state:
+    st.session_state["directory_page"] = 0
+
+
+# --- Directory selection --- 
+# Session state holds only the filter key and (memory mode) a reference to the matching row positions, which are
+# memoized on the shared snapshot -- never a per-session copy of the roster.
+
+ALL_FILTERS = ("All", "All", "All", "")
+
+# Define select_rows()
+def select_rows(filter_key):
+    """Memory mode: row positions (into the shared snapshot) matching a filter key"""
+    position, unit, location, searched_text = filter_key
+    # Precomputed filter bitmaps -> matching row positions (memoized per filter combination)
+    filtered_rows = directory_snapshot.filter_masks.rows(position, unit, location)
+    if searched_text:
+        # Ranked row positions from the prebuilt name index
+        filtered_rows = directory_snapshot.search_index.search(searched_text, within=filtered_rows)
+    return filtered_rows
+
+# Define current_selection()
+def current_selection(filter_key=None):
+    """(DataFrame, row positions into it) for `filter_key` (default: the session's current filter key)"""
+    session_key = st.session_state.get("filter_key", ALL_FILTERS)
+    if filter_key is None:
+        filter_key = session_key
+    if QUERY_MODE == "sql":
+        filtered_df = fetch_directory(*filter_key)
+        if filtered_df is None:
+            st.stop()
+        return filtered_df, np.arange(len(filtered_df))
+    if filter_key != session_key:
+        # Some other selection (e.g. the full-directory export) -- keep the session's own
+        return apa_data, select_rows(filter_key)
+
+    selection = st.session_state.get("selection")
+    if selection is None or selection["key"] != filter_key or selection["version"] != directory_snapshot.version:
+        # First visit, or the shared roster moved to a new version since the rows were selected
+        selection = {"key": filter_key, "version": directory_snapshot.version, "rows": select_rows(filter_key)}
+        st.session_state["selection"] = selection
+    return apa_data, selection["rows"]
+
 
 # --- Define callback functions --- 
 
 # Define update_df() function
 def update_df():
 
-    filtered_df = apa_data.copy()
-
-    if st.session_state["selected_position"] != 'All':
-        filtered_df = filtered_df[filtered_df['Position']==st.session_state["selected_position"]].reset_index(drop=True)
-    if st.session_state["selected_unit"] != 'All':
-        filtered_df = filtered_df[filtered_df['Assigned Unit'].apply(lambda x: st.session_state["selected_unit"] in x)].reset_index(drop=True)
-    if st.session_state["selected_location"] != 'All': 
-        filtered_df = filtered_df[filtered_df['Office Location']==st.session_state["selected_location"]].reset_index(drop=True)
-    if st.session_state["searched_text"]: # Added searched_text to main clickback action 
-        searched_text = st.session_state["searched_text"].strip().lower()
-        search_cols = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
-        filtered_df = filtered_df[
-            filtered_df[search_cols].apply(lambda row: any(searched_text in str(value).lower() for value in row), axis=1)
-        ].reset_index(drop=True)
+    with metrics.span("filter.update_df"):
+        filter_key = (
+            st.session_state["selected_position"],
+            st.session_state["selected_unit"],
+            st.session_state["selected_location"],
+            st.session_state["searched_text"], # Added searched_text to main clickback action 
+        )
+        if QUERY_MODE == "sql":
+            if fetch_directory(*filter_key) is None:
+                return # Keep the previous selection
+        else:
+            st.session_state["selection"] = {"key": filter_key, "version": directory_snapshot.version, "rows": select_rows(filter_key)}
 
-    st.session_state["filtered_df"] = filtered_df.reset_index(drop=True)
+        st.session_state["filter_key"] = filter_key
+        st.session_state["directory_page"] = 0 # New results start on the first page
 
 # Reset filters button
 def reset_filters():
@@ -87,108 +163,36 @@ def reset_filters():
     st.session_state["selected_unit"] = "All"
     st.session_state["selected_location"] = "All"
     st.session_state["searched_text"] = ""
-    filtered_df = apa_data.copy()
-    st.session_state["filtered_df"] = filtered_df
+    st.session_state.pop("filter_key", None)
+    st.session_state.pop("selection", None)
+    st.session_state["directory_page"] = 0
+
+# Callback functions for Main Directory pagination
+def change_page(step):
+    st.session_state["directory_page"] = max(0, st.session_state["directory_page"] + step)
+
+def change_page_size():
+    st.session_state["directory_page_size"] = st.session_state["page_size"]
+    st.session_state["directory_page"] = 0
 
 # Callback function for which directory to view
 def view_directory():
     st.session_state['view'] = st.session_state["directory_view"]
 
-# --- Sidebar Filter functions --- 
+# --- Sidebar (page chrome: only rebuilt on full-app reruns) --- 
 
 with st.sidebar:
-    # Select options: position / unit / location / birthday month 
     st.title("Jackson County Prosecuting Attorney's Office")
     st.write("***Assistant Prosecuting Attorney Directory***")
     st.divider()
     st.write("Please use navigate the JCPAO APA directory to view information on all active attorneys in the Jackson County Prosecuting Attorney's Office.")
     st.divider()
-    st.selectbox(
-            "Select the directory to view",
-            options=['Main Directory','Contact Directory'],
-            key="directory_view",
-            on_change=view_directory
-        )
-    st.divider()
-    # Filter by job position: 
-    positions_dict = {
-        'All': 'All Job Positions', 
-        'Exec': 'Executive Staff', 
-        'CTA': 'Chief Trial Attorneys', 
-        'TTL': 'Team Trial Leaders', 
-        'APA': 'Assistant Prosecuting Attorneys',
-        # 'I': 'Investigators',
-        # 'VA': 'Victim Advocates',
-        # 'LA': 'Legal Assistants',
-        # 'SS': 'Support Staff'
-    }
-    position_options = st.selectbox(
-        label= "Filter by Position:", 
-        options=positions_dict.keys(), # ('All', 'Exec', 'CTA', 'TTL', 'APA', 'I', 'VA', 'LA', 'SS')
-        index=0, # All
-        format_func=lambda x: positions_dict[x],
-        key='selected_position',
-        placeholder="Select position to filter",
-        on_change=update_df,
-    )
-
-    # Filter by unit_enum[]: 
-    units_dict = {
-        'All': 'All Units',
-        'Exec': 'Executive Staff',
-        'GCU': 'General Crimes Unit (GCU)',
-        'SVU': 'Special Victims Unit (SVU)',
-        'VCU': 'Violent Crimes Unit (VCU)',
-        'CSU': 'Crime Strategies Unit (CSU)',
-        # 'COMBAT': 'COMBAT',
-        'Drug': 'Drug Court',
-        'FSD': 'Family Support Division'
-    }
-    unit_options = st.selectbox(
-        label="Filter by Assigned Unit:",
-        options=units_dict.keys(), # ('Exec', 'GCU', 'SVU', 'VCU', 'CSU', 'COMBAT', 'Drug', 'FSD')
-        index=0, # All
-        format_func=lambda x: units_dict[x],
-        key='selected_unit',
-        placeholder="Select unit to filter",
-        on_change=update_df,
-    )
-
-    # Filter by location: 
-    locations_dict = {
-        'All': 'All Office Locations',
-        'Dt-11': 'Downtown Courthouse, 11th floor',
-        'Dt-10': 'Downtown Courthouse, 10th floor',
-        # 'Dt-9': 'Downtown Courthouse, 9th floor (COMBAT)',
-        'Dt-7M': 'Downtown Courthouse, 7M',
-        'Indy': 'Eastern Jackson Courthouse, Independence',
-        'FSD': 'Family Support Division'
-    }
-    location_options = st.selectbox(
-        label="Filter by Office Location:",
-        options=locations_dict.keys(), # ('Dt-11', 'Dt-10', 'Dt-9', 'Dt-7M', 'Indy', 'FSD')
-        index=0, # All
-        format_func=lambda x: locations_dict[x],
-        key='selected_location',
-        placeholder="Select office location to filter",
-        on_change=update_df,
-    )
-
-    # Reset filters 
-    refresh = st.button(
-        label="Reset Filters",
-        key="filter_reset",
-        on_click=reset_filters,
-        type="secondary",
-        icon="🔄",
-    )
-
     st.write("To securely exit directory, logout or exit page:")
     # Logout 
     logout = st.button(
         label="Logout",
         key="logout",
-        on_click=lambda: st.session_state.clear(), # Clear session state
+        on_click=revoke_access_token, # Clear session state and the access token
         type="secondary",
         icon=":material/logout:"
     )
@@ -203,63 +207,19 @@ with st.sidebar:
 
 # --- Internal Directory HELPER funcs --- 
 
-def configure_badge(row):
-
-    # Only possible st.badge colors: blue, green, orange, red, violet, gray/grey, or primary
-    
-    # 'Assigned Unit' - 'Exec' / 'GCU' / 'SVU' / 'VCU' / 'CSU' / 'COMBAT' / 'Drug' / 'FSD'
-    if row['Assigned Unit']:
-        unit = ' / '.join(row['Assigned Unit'])
+def display_headshot(public_id):
+    # Manifest entry (if synced): versioned URL that is cached forever + intrinsic size to reserve the layout
+    headshot_manifest = get_headshot_manifest()
+    entry = headshot_manifest.get(public_id) if headshot_manifest is not None else None
+    version = entry["version"] if entry else None
+    # Local cache mode: bytes served by this app host
+    image_bytes = load_photo_bytes(public_id, HEADSHOT_WIDTH, version=version)
+    if image_bytes is not None:
+        st.image(image_bytes, width=HEADSHOT_WIDTH)
     else:
-        unit = 'N/A'
-    
-    # Drug Court 
-    if 'Drug' in unit:
-        unit = unit.replace("Drug", "Drug Court")
-    
-    # 'Position' - 'Exec' / 'CTA' / 'TTL' / 'APA'
-    if row['Position'] == 'Exec':
-        if row['Position'] == unit:
-            position_badge = f":red-badge[**Executive Staff**]"
-        else:
-            position_badge = f":red-badge[**Executive Staff - {unit}**]"
-    elif row['Position'] == 'CTA':
-        position_badge = f":orange-badge[**Chief Trial Attorney - {unit}**]"
-    elif row['Position'] == 'TTL':
-        position_badge = f":green-badge[**Trial Team Leader - {unit}**]"
-    elif row['Position'] == 'APA':
-        position_badge = f":blue-badge[**Assistant Prosecuting Attorney - {unit}**]"
-    
-    return position_badge
-
-def reformat_location(row):
-
-    # 'Office Location' - 'Dt-11' / 'Dt-10' / 'Dt-9' / 'Dt-7M' / 'Indy' / 'FSD'
-    if row['Office Location'] == 'Dt-11':
-        office_location = "Downtown Courthouse, 11th floor"
-    elif row['Office Location'] == 'Dt-10':
-        office_location = "Downtown Courthouse, 10th floor"
-    elif row['Office Location'] == 'Dt-9':
-        office_location = "Downtown Courthouse, 9th floor (COMBAT)"
-    elif row['Office Location'] == 'Dt-7M':
-        office_location = "Downtown Courthouse, 7M"
-    elif row['Office Location'] == 'Indy':
-        office_location = "Eastern Jackson Courthouse, Independence"
-    elif row['Office Location'] == 'FSD':
-        office_location = "Family Support Division"
-
-    return office_location
-
-def reformat_phone_num(phone_num):
-    # Handle NaN values or non-string types 
-    if not isinstance(phone_num, str) or pd.isna(phone_num):
-        return phone_num
-    
-    # Check length is 10-digits, then reformat 
-    if len(phone_num) == 10:
-        return f"{phone_num[:3]}-{phone_num[3:6]}-{phone_num[6:]}"
-    else:
-        return phone_num
+        # Resized, format-negotiated Cloudinary variant; lazy loading means off-screen headshots are only fetched when scrolled into view
+        display_size = headshot_display_size(entry, HEADSHOT_WIDTH)
+        st.markdown(photo_img_tag(public_id, HEADSHOT_WIDTH, version=version, display_size=display_size), unsafe_allow_html=True)
 
 def display_attorney(row):
 
@@ -270,12 +230,10 @@ def display_attorney(row):
         with col1:
             
             # Headshot Photo (if None, JCPAO logo)
-            if row['PhotoID'] is None: 
-                st.image(jcpao_logo, width=400)
+            if not isinstance(row['PhotoID'], str): # None, or <NA> from the shared (Arrow-backed) roster
+                st.markdown(logo_img_tag(HEADSHOT_WIDTH), unsafe_allow_html=True) # One static URL, fetched once per browser
             else:
-                headshot_path = "JCPAO_headshots/"+row['PhotoID']
-                attorney_headshot = load_photo(headshot_path)
-                st.image(attorney_headshot, width=400)
+                display_headshot(headshot_public_id(row['PhotoID']))
 
         with col2:
 
@@ -285,23 +243,17 @@ def display_attorney(row):
             # Job Title
             st.subheader(f"{row['Job Title']}")
 
-            # Position
-            position_badge = configure_badge(row)
-            st.markdown(position_badge)
+            # Position (pre-rendered badge)
+            st.markdown(row['Badge'])
             
             # Office Location
-            office_location = reformat_location(row)
-            st.write(f"**Office Location:** {office_location}")
+            st.write(f"**Office Location:** {row['Location Label']}")
 
             # Work Email Address
             st.write(f"**Email Address:** {row['Work Email Address']}")
 
-            # Work Phone Number 
-            work_phone = reformat_phone_num(row['Work Phone #'])
-            if str(row['Work Phone #']).startswith("816881"):
-                st.write(f"**Work Phone:** {work_phone} (ext. {str(row['Work Phone #'])[-4:]})")
-            else:
-                st.write(f"**Work Phone:** {work_phone}")
+            # Work Phone Number (pre-formatted, incl. 816-881 extension)
+            st.write(f"**Work Phone:** {row['Phone Display']}")
             
         st.divider()
 
@@ -312,13 +264,13 @@ st.divider()
 
 def main_directory():
 
-    df = st.session_state.get("filtered_df", apa_data)
+    df, filtered_rows = current_selection()
 
     # Text search
     searched_text = st.text_input(
         "Search attorney name:",
         key="searched_text",
-        # on_change=update_df,
+        on_change=update_df, # Indexed lookup -- cheap enough to search as you type
     )
 
     text_search = st.button(
@@ -330,34 +282,184 @@ def main_directory():
 
     st.divider()
 
-    if df.empty:
+    if len(filtered_rows) == 0:
         st.warning("No attorneys found matching the search criteria.")
     else:
-        for i, row in df.iterrows():
-            display_attorney(row)
+        # Only build the visible page of attorneys
+        page_size = st.session_state["directory_page_size"]
+        n_pages = -(-len(filtered_rows) // page_size)
+        page = min(st.session_state["directory_page"], n_pages - 1)
+        st.session_state["directory_page"] = page
+
+        with metrics.span("render.main_directory"):
+            for i, row in df.iloc[filtered_rows[page * page_size:(page + 1) * page_size]].iterrows():
+                display_attorney(row)
+
+        display_page_controls(page, n_pages, len(filtered_rows))
+
+
+def display_page_controls(page, n_pages, n_results):
+    """Previous / Next buttons, page position and page size for the Main Directory"""
+
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 1], vertical_alignment="center")
+
+    with col1:
+        st.button(
+            "Previous",
+            icon=":material/chevron_left:",
+            key="page_previous",
+            on_click=change_page,
+            args=(-1,),
+            disabled=page == 0,
+        )
+    with col2:
+        st.write(f"Page {page + 1} of {n_pages} ({n_results} attorneys)")
+    with col3:
+        st.button(
+            "Next",
+            icon=":material/chevron_right:",
+            key="page_next",
+            on_click=change_page,
+            args=(1,),
+            disabled=page >= n_pages - 1,
+        )
+    with col4:
+        page_size_options = sorted(set(PAGE_SIZE_OPTIONS + [st.session_state["directory_page_size"]]))
+        st.selectbox(
+            "Attorneys per page:",
+            options=page_size_options,
+            index=page_size_options.index(st.session_state["directory_page_size"]),
+            key="page_size",
+            on_change=change_page_size,
+        )
 
 
 def contact_directory():
 
     # NO Text Search -- ignore 'searched_text' 
     st.session_state["searched_text"] = ""
+    if st.session_state.get("filter_key", ALL_FILTERS)[3]:
+        update_df()
+
+    filter_key = st.session_state.get("filter_key", ALL_FILTERS)
+    df, filtered_rows = current_selection()
+    contacts = df.iloc[filtered_rows] # Already in 'Last Name' order (roster order)
+
+    # Tables / exports are built once per roster version + filter key (SQL mode: per query_directory TTL window)
+    data_version = directory_snapshot.version if directory_snapshot is not None else int(time.time() // 60)
+
+    with metrics.span("render.contact_directory"):
+        attorney_contacts = get_contact_table(contacts, data_version, filter_key)
+        st.dataframe(attorney_contacts, hide_index=True, height=int(35.2 * (len(attorney_contacts) + 1)))
+
+    # Bulk exports of the current filter selection, or the full directory
+    export_key, export_rows = filter_key, contacts
+    if filter_key != ALL_FILTERS:
+        export_scope = st.radio("Export", ["Current filters", "Full directory"], horizontal=True, key="export_scope")
+        if export_scope == "Full directory":
+            export_key = ALL_FILTERS
+            full_df, full_rows = current_selection(ALL_FILTERS)
+            export_rows = full_df.iloc[full_rows]
+
+    csv_col, vcf_col = st.columns(2)
+    with csv_col:
+        st.download_button(
+            "Download CSV",
+            data=build_contact_export(export_rows, data_version, export_key, "csv"),
+            file_name="jcpao_contact_directory.csv",
+            mime="text/csv",
+            key="export_csv",
+            on_click="ignore",
+            use_container_width=True,
+        )
+    with vcf_col:
+        st.download_button(
+            "Download vCards",
+            data=build_contact_export(export_rows, data_version, export_key, "vcf"),
+            file_name="jcpao_contact_directory.vcf",
+            mime="text/vcard",
+            key="export_vcf",
+            on_click="ignore",
+            use_container_width=True,
+        )
+
+
+# --- Directory fragment --- 
+# Filters, search, paging and the view switch live inside one st.fragment, so those interactions rerun only the
+# directory below -- not streamlit_app.py (verification gate, navigation) or the page chrome / sidebar above.
+# (Widgets inside a fragment cannot be placed in st.sidebar, hence the filter bar above the listing.)
+
+def display_filter_bar():
+    """Directory view + Position / Assigned Unit / Location filters + reset"""
+
+    view_col, position_col, unit_col, location_col, reset_col = st.columns([1.2, 1, 1, 1, 0.7], vertical_alignment="bottom")
 
-    df = st.session_state.get("filtered_df", apa_data)
+    with view_col:
+        st.selectbox(
+            "Select the directory to view",
+            options=['Main Directory','Contact Directory'],
+            key="directory_view",
+            on_change=view_directory
+        )
+
+    with position_col:
+        # Filter by job position: (positions_dict)
+        st.selectbox(
+            label= "Filter by Position:", 
+            options=positions_dict.keys(), # ('All', 'Exec', 'CTA', 'TTL', 'APA', 'I', 'VA', 'LA', 'SS')
+            index=0, # All
+            format_func=lambda x: positions_dict[x],
+            key='selected_position',
+            placeholder="Select position to filter",
+            on_change=update_df,
+        )
 
-    # Reformat df
-    df = df.sort_values(by=['Last Name'])
-    attorney_contacts = df[['Full Name','Work Email Address', 'Work Phone #']].copy()
-    attorney_contacts['Work Phone #'] = attorney_contacts['Work Phone #'].apply(reformat_phone_num)
-    attorney_contacts.rename(columns={
-        'Full Name': 'Attorney Name',
-        'Work Email Address': 'Email Address',
-        'Work Phone #': 'Phone Number'
-    })
-    st.dataframe(attorney_contacts, hide_index=True, height=int(35.2 * (len(df) + 1)))
+    with unit_col:
+        # Filter by unit_enum[]: (units_dict)
+        st.selectbox(
+            label="Filter by Assigned Unit:",
+            options=units_dict.keys(), # ('Exec', 'GCU', 'SVU', 'VCU', 'CSU', 'COMBAT', 'Drug', 'FSD')
+            index=0, # All
+            format_func=lambda x: units_dict[x],
+            key='selected_unit',
+            placeholder="Select unit to filter",
+            on_change=update_df,
+        )
+
+    with location_col:
+        # Filter by location: (locations_dict)
+        st.selectbox(
+            label="Filter by Office Location:",
+            options=locations_dict.keys(), # ('Dt-11', 'Dt-10', 'Dt-9', 'Dt-7M', 'Indy', 'FSD')
+            index=0, # All
+            format_func=lambda x: locations_dict[x],
+            key='selected_location',
+            placeholder="Select office location to filter",
+            on_change=update_df,
+        )
+
+    with reset_col:
+        # Reset filters 
+        st.button(
+            label="Reset Filters",
+            key="filter_reset",
+            on_click=reset_filters,
+            type="secondary",
+            icon="🔄",
+        )
+
+@st.fragment
+def directory_fragment():
+    with metrics.span("render.directory_fragment"):
+        load_directory() # Fragment reruns skip the page script, so new roster versions are picked up here
+
+        display_filter_bar()
+        st.divider()
 
+        if st.session_state['view'] == 'Main Directory':
+            main_directory()
+        elif st.session_state['view'] == 'Contact Directory':
+            contact_directory()
 
-if st.session_state['view'] == 'Main Directory':
-    main_directory()
-elif st.session_state['view'] == 'Contact Directory':
-    contact_directory()
+directory_fragment()
 
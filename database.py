@@ -1,45 +1,456 @@
+import atexit
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
 import streamlit as st
 import pandas as pd
 import psycopg2
-from psycopg2 import pool, sql, OperationalError
-from psycopg2.extras import RealDictCursor
+from psycopg2 import pool, sql, OperationalError, InterfaceError
+from psycopg2.extensions import TRANSACTION_STATUS_UNKNOWN
+from psycopg2.extras import execute_values
+
+import metrics
+from resilience import CircuitBreaker, Keepalive, retry_with_backoff
+
+
+# --- Connection pool --- 
+
+class PoolTimeout(pool.PoolError):
+    """Raised when no pooled connection frees up within the checkout timeout"""
+
+
+class CircuitOpen(pool.PoolError):
+    """Raised without touching the database while the pool's circuit breaker is open"""
+
+
+class DirectoryConnectionPool(pool.ThreadedConnectionPool):
+    """Thread-safe connection pool (one per process): blocking checkout with timeout, validated connections, guaranteed return"""
+
+    def __init__(self, minconn, maxconn, *args, checkout_timeout=10.0, ping_after=30.0, breaker=None, connect_retries=2, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after # Ping connections that sat idle in the pool longer than this (seconds)
+        self.breaker = breaker # CircuitBreaker (optional): fail fast while the database is unreachable
+        self.connect_retries = connect_retries # Extra attempts (backoff + jitter) when opening a connection fails
+        self._slots = threading.BoundedSemaphore(maxconn) # ThreadedConnectionPool raises instead of waiting when exhausted
+        self._returned_at = {id(conn): time.monotonic() for conn in self._pool} # id(idle conn) -> when it went idle
+        self._stats_lock = threading.Lock()
+        self._stats = Counter()
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def stats(self):
+        """checkouts / checkout_timeouts / discarded counters, total checkout wait and current usage"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["in_use"] = len(self._used)
+        stats["idle"] = len(self._pool)
+        stats["max_size"] = self.maxconn
+        return stats
+
+    def _is_usable(self, conn):
+        """Cheap validation on checkout; only pings the server for connections that have been idle a while"""
+        if conn.closed or conn.info.transaction_status == TRANSACTION_STATUS_UNKNOWN:
+            return False
+        idle_since = self._returned_at.get(id(conn))
+        if idle_since is None or time.monotonic() - idle_since < self.ping_after:
+            return True # Freshly opened, or recently used
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except (OperationalError, InterfaceError):
+            return False
+        return True
+
+    def _checkout(self):
+        # Every idle connection may be dead (e.g. all min_size connections after Neon suspended the compute):
+        # discard until one validates, or the idle pool is empty and getconn() opens a fresh one
+        for _ in range(self.maxconn + 1):
+            conn = self.getconn()
+            if self._is_usable(conn):
+                return conn
+            self._count("discarded")
+            self._returned_at.pop(id(conn), None)
+            self.putconn(conn, close=True)
+        raise OperationalError("No usable database connection")
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Check out a connection for the duration of the `with` block; it is ALWAYS returned to the pool"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        wait_start = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout):
+            self._count("checkout_timeouts")
+            metrics.increment("pool.checkout_timeout")
+            raise PoolTimeout(f"No database connection available within {timeout}s")
+        if self.breaker is not None and not self.breaker.allow():
+            self._slots.release()
+            metrics.increment("pool.circuit_rejected")
+            raise CircuitOpen(f"Database unavailable; retrying in {self.breaker.retry_after():.0f}s")
+        waited = time.perf_counter() - wait_start
+        self._count("checkouts")
+        self._count("checkout_wait_seconds", waited)
+        metrics.increment("pool.checkout")
+        metrics.record("pool.checkout_wait", waited)
+        conn = None
+        failed = False
+        try:
+            conn = retry_with_backoff(self._checkout, (OperationalError, InterfaceError), attempts=self.connect_retries + 1)
+            yield conn
+        except (OperationalError, InterfaceError):
+            failed = True
+            raise
+        finally:
+            if self.breaker is not None:
+                self.breaker.record_failure() if failed else self.breaker.record_success()
+            if conn is not None:
+                self._returned_at[id(conn)] = time.monotonic()
+                self.putconn(conn, close=bool(conn.closed)) # putconn() rolls back any open transaction
+                if conn.closed: # Dead, or closed by putconn() because the pool already holds min_size idle connections
+                    self._returned_at.pop(id(conn), None)
+            self._slots.release()
+
 
 # Define get_database_session() 
 @st.cache_resource
 def get_database_session(database_url):
+    """Create the process-wide connection pool; pool sizing is configurable under [pool] in secrets.toml"""
+    pool_config = st.secrets.get("pool", {})
+    breaker = CircuitBreaker(
+        failure_threshold=pool_config.get("breaker_failures", 3),
+        reset_timeout=pool_config.get("breaker_reset", 30.0),
+    )
+    pool_options = dict(
+        checkout_timeout=pool_config.get("checkout_timeout", 10.0),
+        ping_after=pool_config.get("ping_after", 30.0),
+        breaker=breaker,
+        connect_retries=pool_config.get("connect_retries", 2),
+    )
     try: 
         # Create a database session object that points to the URL.
-        return pool.SimpleConnectionPool(1, 10, database_url) # Initialize connection pool
+        connection_pool = DirectoryConnectionPool(pool_config.get("min_size", 1), pool_config.get("max_size", 10), database_url, **pool_options) # Initialize connection pool
     except OperationalError as e:
-        st.error("Network is blocking connection to the database server. Please try again on a different network/internet connection, and reach out to admin at ujcho@jacksongov.org")
-        return None
+        # Database unreachable (or still waking up): start empty and connect on demand, behind the circuit breaker,
+        # so sessions can be served from the persisted roster instead of caching a dead pool for the process
+        print(f"Database unreachable at startup, connecting on demand: {e}")
+        breaker.record_failure()
+        connection_pool = DirectoryConnectionPool(0, pool_config.get("max_size", 10), database_url, **pool_options)
+        # Nothing opened up front, but keep the configured min_size so returned connections stay pooled
+        # (psycopg2 closes every returned connection beyond minconn)
+        connection_pool.minconn = pool_config.get("min_size", 1)
+    atexit.register(connection_pool.closeall)
+    metrics.register_collector("connection_pool", connection_pool.stats)
+    metrics.register_collector("db_circuit", breaker.stats)
+
+    # Optional business-hours keepalive (keeps a scale-to-zero compute awake while the directory is in use)
+    if pool_config.get("keepalive_interval"):
+        keepalive = Keepalive(
+            connection_pool,
+            interval=pool_config["keepalive_interval"],
+            hours=tuple(pool_config.get("keepalive_hours", (7, 18))),
+            weekdays=tuple(pool_config.get("keepalive_weekdays", (0, 1, 2, 3, 4))),
+            timezone=pool_config.get("timezone"),
+        ).start()
+        atexit.register(keepalive.stop)
+        metrics.register_collector("keepalive", keepalive.stats)
+    return connection_pool
     
 
-# Define get_apa_data()
-@st.cache_data
-def get_apa_data(_connection_pool):
-    # --- Collect APA data --- 
+# --- APA roster (change-aware refresh) --- 
+
+ROSTER_POSITIONS = ['Exec', 'CTA', 'TTL', 'APA'] # I - Investigator, VA - Victim Advocate, INTERN - intern
+# Only the columns the court view displays / searches (no Race, etc.) -- all that is loaded, cached or persisted
+ROSTER_COLUMNS = [
+    "Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name",
+    "Job Title", "Position", "Assigned Unit", "Office Location", "Work Email Address", "Work Phone #", "PhotoID",
+]
+
+def _roster_filter(key_column=None):
+    """WHERE clause (and params) selecting the court-view positions; optionally restricted to a list of row keys"""
+    where = sql.SQL("{where_col} IN ({positions})").format(
+        where_col=sql.Identifier('Position'),
+        positions=sql.SQL(', ').join([sql.Placeholder()] * len(ROSTER_POSITIONS))
+    )
+    if key_column is not None:
+        where = sql.SQL("{where} AND {key_col} = ANY(%s)").format(where=where, key_col=sql.Identifier(key_column))
+    return where
+
+# Define fetch_roster_version()
+def fetch_roster_version(conn):
+    """Cheap version signal for the roster: row count + checksum of every row, computed server-side (returns one row)"""
+    with conn.cursor() as cur:
+        query = sql.SQL("SELECT count(*), md5(coalesce(string_agg(md5(e::text), '' ORDER BY md5(e::text)), '')) FROM employee_info_view e WHERE {where}").format(
+            where=_roster_filter()
+        )
+        cur.execute(query, ROSTER_POSITIONS)
+        row_count, checksum = cur.fetchone()
+    return f"{row_count}:{checksum}"
+
+# Define fetch_row_hashes()
+def fetch_row_hashes(conn, key_column):
+    """Per-row checksums keyed by `key_column`, used to find which rows changed since the last load;
+    None if `key_column` has NULLs or duplicates (rows can't be matched by key -- reload in full instead)"""
+    with conn.cursor() as cur:
+        query = sql.SQL("SELECT {key_col}, md5(e::text) FROM employee_info_view e WHERE {where}").format(
+            key_col=sql.Identifier(key_column),
+            where=_roster_filter()
+        )
+        cur.execute(query, ROSTER_POSITIONS)
+        rows = cur.fetchall()
+    row_hashes = dict(rows)
+    if len(row_hashes) != len(rows) or None in row_hashes:
+        return None
+    return row_hashes
+
+# Define register_enum_arrays()
+_enum_arrays_lock = threading.Lock()
+_enum_arrays_registered = False
+
+def register_enum_arrays(conn):
+    """Teach psycopg2 (process-wide, once) to decode Postgres enum arrays such as unit_enum[] into Python lists"""
+    global _enum_arrays_registered
+    with _enum_arrays_lock:
+        if _enum_arrays_registered:
+            return
+        with conn.cursor() as cur:
+            cur.execute("SELECT typname, typarray FROM pg_type WHERE typtype = 'e' AND typarray <> 0")
+            enum_arrays = cur.fetchall()
+        for typname, typarray in enum_arrays:
+            psycopg2.extensions.register_type(
+                psycopg2.extensions.new_array_type((typarray,), f"{typname.upper()}[]", psycopg2.STRING)
+            )
+        _enum_arrays_registered = True
+
+# Define load_apa_data()
+def load_apa_data(conn, keys=None, key_column=None, batch_size=1000):
+    """Query the APA roster's ROSTER_COLUMNS (all rows, or only rows whose `key_column` is in `keys`) along with each
+    row's checksum.
+
+    Rows are streamed through a server-side (named) cursor in `batch_size` batches and decoded straight into
+    per-column lists -- no per-row dicts -- and enum arrays arrive as native lists.
+    """
+    register_enum_arrays(conn)
+    columns = ROSTER_COLUMNS + ([key_column] if key_column and key_column not in ROSTER_COLUMNS else [])
+    query = sql.SQL("SELECT {select_list}, md5(e::text) AS {hash_col} FROM employee_info_view e WHERE {where} ORDER BY {order_col}").format(
+        select_list=sql.SQL(', ').join(sql.SQL("e.{}").format(sql.Identifier(col)) for col in columns),
+        hash_col=sql.Identifier('_row_hash'),
+        where=_roster_filter(key_column if keys is not None else None),
+        order_col=sql.Identifier('Last Name')
+    )
+    params = list(ROSTER_POSITIONS) if keys is None else ROSTER_POSITIONS + [list(keys)]
 
-    with _connection_pool.getconn() as conn:
+    with conn.cursor(name="apa_roster_load") as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        batch = cur.fetchmany(batch_size)
+        columns = [desc.name for desc in cur.description]
+        column_values = [[] for _ in columns]
+        while batch:
+            for values, batch_values in zip(column_values, zip(*batch)):
+                values.extend(batch_values)
+            batch = cur.fetchmany(batch_size)
+    return pd.DataFrame(dict(zip(columns, column_values)), columns=columns)
 
-        # Open cursor to perform database operations
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+
+class RosterCache:
+    """Process-wide APA roster that reloads only when the database's version signal changes.
+
+    refresh_mode="changes": at most every `check_interval` seconds, one thread compares the roster checksum and,
+    if it moved, fetches ONLY the changed rows and merges them in; everyone else keeps reading the current frame.
+    refresh_mode="static": load once per process (the previous @st.cache_data behavior).
+
+    With a `shared_store` (SharedRosterStore), worker processes share one memory-mapped copy: only the worker
+    holding the store's lock talks to Postgres (and publishes), the others adopt each newly published version.
+    The store also persists the last good roster, so a restarted process serves it at once (stale-while-revalidate).
+
+    Refreshes run in a background thread: sessions always get the current frame immediately, and keep getting
+    it while the database is cold or unreachable.
+    """
+
+    def __init__(self, connection_pool, refresh_mode="changes", check_interval=60.0, key_column="Work Email Address", shared_store=None):
+        self._pool = connection_pool
+        self._shared = shared_store
+        self.refresh_mode = refresh_mode
+        self.check_interval = check_interval
+        self.key_column = key_column
+        self._lock = threading.Lock()
+        self._state = (None, None) # (version, DataFrame) -- swapped as one tuple so readers never see a torn pair
+        self._row_hashes = {}
+        self._checked_at = 0.0
+
+    @property
+    def version(self):
+        return self._state[0]
+
+    def get(self):
+        """Return (version, DataFrame); the frame is shared, so treat it as READ-ONLY"""
+        if self._state[1] is None:
+            with self._lock:
+                if self._state[1] is None:
+                    metrics.increment("roster.cache_miss")
+                    self._full_load()
+        else:
+            metrics.increment("roster.cache_hit")
+        if self.refresh_mode == "changes" and time.monotonic() - self._checked_at >= self.check_interval:
+            self._refresh_in_background()
+        return self._state
+
+    def _refresh_in_background(self):
+        """Revalidate on a daemon thread (one at a time); never makes a session wait on the database"""
+        if not self._lock.acquire(blocking=False):
+            return
+        self._checked_at = time.monotonic()
+
+        def revalidate():
+            try:
+                self._sync_shared() if self._shared is not None else self._refresh()
+            except Exception as e:
+                print(f"Roster refresh failed, serving cached roster: {e}")
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=revalidate, name="roster-refresh", daemon=True).start()
+
+    def _full_load(self):
+        if self._shared is not None and self._adopt_shared():
+            if time.time() - self._shared.current()["checked_at"] >= self.check_interval:
+                self._checked_at = float("-inf") # Persisted copy may be stale: serve it, revalidate right away
+            return
+        with self._shared.refresh_lock() if self._shared is not None else nullcontext():
+            if self._shared is not None and self._adopt_shared(): # Published by another worker while we waited
+                return
+            with metrics.span("db.roster_load"), self._pool.connection() as conn:
+                version = fetch_roster_version(conn)
+                df = load_apa_data(conn, key_column=self.key_column)
+            self._store(version, df, publish=True)
+
+    def _adopt_shared(self, pointer=None):
+        """Swap to the shared store's current version if it differs from ours; False if nothing (readable) is published"""
+        pointer = pointer or self._shared.current()
+        if pointer is None:
+            return False
+        if pointer["version"] != self.version:
             try:
-                query = sql.SQL("SELECT * FROM employee_info_view WHERE {where_col} IN (%s, %s, %s, %s) ORDER BY {order_col}").format(
-                    where_col=sql.Identifier('Position'),
-                    order_col=sql.Identifier('Last Name')
-                )
-
-                cur.execute(query, ['Exec', 'CTA', 'TTL', 'APA']) # I - Investigator, VA - Victim Advocate, INTERN - intern
-            except psycopg2.Error as e:
-                st.error(f"Problem with loading data: {e}")
-            else:
-                results = cur.fetchall()
-                df = pd.DataFrame(results)
-                return df
-
-        cur.close()
-    conn.close()
+                self._store(*self._shared.load(pointer))
+            except (OSError, ValueError, KeyError) as e: # Missing / truncated arrow file (pa.ArrowInvalid is a ValueError)
+                metrics.increment("roster.shared_load_error")
+                print(f"Shared roster {pointer.get('file')} unreadable, loading from the database: {e}")
+                return False
+        return True
+
+    def _sync_shared(self):
+        """Adopt the latest published version; if no worker checked Postgres within `check_interval`, check (and publish)"""
+        self._checked_at = time.monotonic()
+        pointer = self._shared.current()
+        if pointer is not None and time.time() - pointer["checked_at"] < self.check_interval and self._adopt_shared(pointer):
+            return
+        with self._shared.refresh_lock(blocking=False) as acquired:
+            pointer = self._shared.current()
+            adopted = pointer is not None and self._adopt_shared(pointer) # Diff against the published version
+            if not acquired or (adopted and time.time() - pointer["checked_at"] < self.check_interval):
+                return # Another worker is refreshing / just refreshed (an unreadable file is republished)
+            self._refresh()
+
+    def _store(self, version, df, row_hashes=None, publish=False):
+        if row_hashes is None:
+            row_hashes = dict(zip(df[self.key_column], df['_row_hash'])) if '_row_hash' in df and self.key_column in df else {}
+        self._row_hashes = row_hashes
+        if publish and self._shared is not None:
+            if self.key_column in df:
+                df = df.assign(_row_hash=df[self.key_column].map(row_hashes))
+            df = self._shared.publish(version, df.reset_index(drop=True)) # Serve the mapped copy, like the other workers
+        df = df.drop(columns=['_row_hash'], errors='ignore').reset_index(drop=True)
+        self._checked_at = time.monotonic()
+        self._state = (version, df)
+
+    def _has_unique_keys(self, df):
+        """True if every cached row has a distinct, non-null `key_column` value"""
+        if self.key_column not in df:
+            return False
+        keys = df[self.key_column]
+        return not (keys.isna().any() or keys.duplicated().any())
+
+    def _refresh(self):
+        self._checked_at = time.monotonic()
+        version, df = self._state
+        try:
+            with metrics.span("db.roster_refresh"), self._pool.connection() as conn:
+                new_version = fetch_roster_version(conn)
+                metrics.increment("roster.version_check")
+                if new_version == version:
+                    if self._shared is not None:
+                        self._shared.touch()
+                    return
+                metrics.increment("roster.changed")
+                row_hashes = fetch_row_hashes(conn, self.key_column) if self._has_unique_keys(df) else None
+                if row_hashes is None:
+                    # No usable row key (NULL / duplicate emails): an incremental merge would drop or duplicate rows
+                    metrics.increment("roster.full_reload")
+                    self._store(new_version, load_apa_data(conn, key_column=self.key_column), publish=True)
+                    return
+                changed = [key for key, row_hash in row_hashes.items() if self._row_hashes.get(key) != row_hash]
+                removed = {key for key in self._row_hashes.keys() - row_hashes.keys() if key is not None}
+                changed_rows = load_apa_data(conn, keys=changed, key_column=self.key_column) if changed else pd.DataFrame()
+        except (psycopg2.Error, pool.PoolError) as e:
+            print(f"Roster refresh failed, serving cached roster: {e}")
+            return
+
+        # Merge the changed rows into the cached frame
+        stale = df[self.key_column].isin(removed.union(changed))
+        merged = pd.concat([df[~stale], changed_rows], ignore_index=True)
+        merged = merged.sort_values(by='Last Name', kind='stable')
+        self._store(new_version, merged, row_hashes=row_hashes, publish=True)
+
+
+# Define roster_store_dir()
+def roster_store_dir():
+    """Directory the roster is stored in (None when it is only held in memory)"""
+    roster_config = st.secrets.get("roster", {})
+    # shared_dir: one copy for all workers on the host; otherwise persist_dir keeps this process's last good roster
+    if roster_config.get("shared_dir"):
+        return roster_config["shared_dir"]
+    if roster_config.get("refresh_mode", "changes") == "changes":
+        return roster_config.get("persist_dir", ".cache/roster")
+    return None
+
+# Define get_roster_cache()
+@st.cache_resource
+def get_roster_cache(_connection_pool):
+    """Process-wide RosterCache; refresh behavior is configurable under [roster] in secrets.toml"""
+    roster_config = st.secrets.get("roster", {})
+    refresh_mode = roster_config.get("refresh_mode", "changes")
+    store_dir = roster_store_dir()
+    shared_store = None
+    if store_dir:
+        from shared_roster import SharedRosterStore
+        shared_store = SharedRosterStore(store_dir)
+    return RosterCache(
+        _connection_pool,
+        refresh_mode=refresh_mode,
+        check_interval=roster_config.get("check_interval", 60.0),
+        key_column=roster_config.get("key_column", "Work Email Address"),
+        shared_store=shared_store,
+    )
+
+# Define get_apa_roster()
+def get_apa_roster(_connection_pool):
+    """Return (version, APA roster DataFrame), or (None, None) if the roster could not be loaded"""
+    try:
+        return get_roster_cache(_connection_pool).get()
+    except (psycopg2.Error, pool.PoolError) as e:
+        st.error(f"Problem with loading data: {e}")
+        return None, None
+
+# Define get_apa_data()
+def get_apa_data(_connection_pool):
+    # --- Collect APA data --- 
+    version, df = get_apa_roster(_connection_pool)
+    return df
 
 # Define fetch_list()
 @st.cache_data
@@ -52,20 +463,21 @@ def fetch_list(df, col_name):
     else:
         return output
     
+# Define insert_log_rows()
+def insert_log_rows(conn, db_table_name, rows):
+    """Multi-row INSERT of (user_email, user_ip) tuples into an activity log table (caller commits)"""
+    with conn.cursor() as cur:
+        query = sql.SQL("INSERT INTO {table_name} (user_email, user_ip) VALUES %s").format(
+            table_name=sql.Identifier(db_table_name)
+        )
+        execute_values(cur, query, rows, page_size=max(len(rows), 1))
+
 # Define external_log_activity()
 def external_log_activity(_connection_pool, db_table_name, user_email, user_ip): # police_log, courts_log 
 
-    with _connection_pool.getconn() as conn:
-
-        with conn.cursor() as cur:
-            try: 
-                query = sql.SQL("INSERT INTO {table_name} (user_email, user_ip) VALUES (%s, %s)").format(
-                    table_name=sql.Identifier(db_table_name)
-                )
-                cur.execute(query, (user_email, user_ip))
-            except psycopg2.Error as e:
-                st.error(f"An error has occurred.")
-            else:
-                conn.commit()
-        cur.close()
-    conn.close()
\ No newline at end of file
+    try:
+        with metrics.span("db.log_activity"), _connection_pool.connection() as conn:
+            insert_log_rows(conn, db_table_name, [(user_email, user_ip)])
+            conn.commit()
+    except (psycopg2.Error, pool.PoolError) as e:
+        st.error(f"An error has occurred.")
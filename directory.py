@@ -0,0 +1,271 @@
+"""
+File: directory.py
+Function: Shared, display-ready APA directory snapshot (built once per data version, read by every court_view session)
+"""
+
+from functools import lru_cache
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import metrics
+from database import get_apa_roster
+from search import NameSearchIndex
+
+
+# --- Directory lookups ---
+
+# Filter by job position:
+positions_dict = {
+    'All': 'All Job Positions',
+    'Exec': 'Executive Staff',
+    'CTA': 'Chief Trial Attorneys',
+    'TTL': 'Team Trial Leaders',
+    'APA': 'Assistant Prosecuting Attorneys',
+    # 'I': 'Investigators',
+    # 'VA': 'Victim Advocates',
+    # 'LA': 'Legal Assistants',
+    # 'SS': 'Support Staff'
+}
+
+# Filter by unit_enum[]:
+units_dict = {
+    'All': 'All Units',
+    'Exec': 'Executive Staff',
+    'GCU': 'General Crimes Unit (GCU)',
+    'SVU': 'Special Victims Unit (SVU)',
+    'VCU': 'Violent Crimes Unit (VCU)',
+    'CSU': 'Crime Strategies Unit (CSU)',
+    # 'COMBAT': 'COMBAT',
+    'Drug': 'Drug Court',
+    'FSD': 'Family Support Division'
+}
+
+# Filter by location:
+locations_dict = {
+    'All': 'All Office Locations',
+    'Dt-11': 'Downtown Courthouse, 11th floor',
+    'Dt-10': 'Downtown Courthouse, 10th floor',
+    # 'Dt-9': 'Downtown Courthouse, 9th floor (COMBAT)',
+    'Dt-7M': 'Downtown Courthouse, 7M',
+    'Indy': 'Eastern Jackson Courthouse, Independence',
+    'FSD': 'Family Support Division'
+}
+
+
+# --- Directory HELPER funcs ---
+
+def parse_enum(array):
+    if isinstance(array, (list, tuple, np.ndarray)): # Already decoded (columnar loader / SQL query mode / shared Arrow roster)
+        return list(array)
+    if pd.isna(array):
+        return []
+    array = array.strip('{}')
+    return array.split(',') if array else []
+
+# --- Vectorized display formatting (lookup tables + pandas string ops; no per-row Python) ---
+
+# 'Position' -> (st.badge color, badge title). Only possible st.badge colors: blue, green, orange, red, violet, gray/grey, or primary
+POSITION_BADGES = {
+    'Exec': ("red", "Executive Staff"),
+    'CTA': ("orange", "Chief Trial Attorney"),
+    'TTL': ("green", "Trial Team Leader"),
+    'APA': ("blue", "Assistant Prosecuting Attorney"),
+}
+UNKNOWN_POSITION_BADGE = ("gray", None) # Title falls back to the raw position code
+
+# 'Assigned Unit' code -> badge text (codes are shown as-is, except Drug Court)
+UNIT_BADGE_LABELS = {code: code for code in units_dict if code != 'All'} | {'Drug': units_dict['Drug']}
+
+# 'Office Location' code -> label; 'Dt-9' is no longer a filter option but may still be on rows
+LOCATION_LABELS = {code: label for code, label in locations_dict.items() if code != 'All'} | {'Dt-9': "Downtown Courthouse, 9th floor (COMBAT)"}
+UNKNOWN_LOCATION_LABEL = "N/A"
+
+def _unit_badge_label(units):
+    return ' / '.join(UNIT_BADGE_LABELS.get(unit, unit) for unit in units) if len(units) else 'N/A'
+
+def _position_badge(position, units):
+    color, title = POSITION_BADGES.get(position, UNKNOWN_POSITION_BADGE)
+    title = title or (position if isinstance(position, str) else "Attorney")
+    if position == 'Exec' and tuple(units) == ('Exec',):
+        return f":{color}-badge[**{title}**]"
+    return f":{color}-badge[**{title} - {_unit_badge_label(units)}**]"
+
+def format_badges(positions, units):
+    """Position/unit badge markdown per row; built once per distinct (position, units) pair and mapped back by code"""
+    position_codes, position_values = pd.factorize(positions)
+    unit_codes, unit_values = pd.factorize(units)
+    n_units = len(unit_values) + 1 # +1: code -1 (missing) shifts to 0
+    pairs, pair_index = np.unique((position_codes + 1) * n_units + (unit_codes + 1), return_inverse=True)
+    badges = np.empty(len(pairs), dtype=object)
+    for i, pair in enumerate(pairs):
+        position_code, unit_code = divmod(int(pair), n_units)
+        badges[i] = _position_badge(
+            position_values[position_code - 1] if position_code else None,
+            unit_values[unit_code - 1] if unit_code else (),
+        )
+    return pd.Series(badges[pair_index], index=positions.index)
+
+def format_locations(locations):
+    """Office location labels; unknown codes show the code itself, missing ones UNKNOWN_LOCATION_LABEL"""
+    codes = locations.astype(object)
+    labels = codes.map(LOCATION_LABELS)
+    return labels.where(labels.notna(), codes).fillna(UNKNOWN_LOCATION_LABEL)
+
+def format_phone_numbers(phone_nums):
+    """(Phone Number, Phone Display): 10-digit numbers as ###-###-####, others unchanged; the display value adds
+    the 4-digit extension for 816-881 (county) numbers. Missing numbers stay None; non-string values pass through."""
+    values = phone_nums.to_numpy(object)
+    is_text = np.fromiter((isinstance(value, str) for value in values), dtype=bool, count=len(values))
+    text = pa.array(np.where(is_text, values, None), type=pa.string(), from_pandas=True) # Arrow compute kernels
+    ten_digits = pc.fill_null(pc.equal(pc.utf8_length(text), 10), False)
+    county = pc.fill_null(pc.starts_with(text, "816881"), False)
+    dashed = pc.binary_join_element_wise(
+        pc.utf8_slice_codeunits(text, 0, 3), pc.utf8_slice_codeunits(text, 3, 6), pc.utf8_slice_codeunits(text, 6), "-"
+    )
+    phone_number = pc.if_else(ten_digits, dashed, text)
+    phone_display = pc.if_else(
+        county, pc.binary_join_element_wise(phone_number, " (ext. ", pc.utf8_slice_codeunits(text, -4), ")", ""), phone_number
+    )
+    phone_number, phone_display = phone_number.to_numpy(zero_copy_only=False), phone_display.to_numpy(zero_copy_only=False)
+    passthrough = ~is_text & pd.notna(values) # e.g. a number stored as int: shown unchanged, like any unformattable value
+    if passthrough.any():
+        phone_number, phone_display = np.where(passthrough, values, phone_number), np.where(passthrough, values, phone_display)
+    return pd.Series(phone_number, index=phone_nums.index), pd.Series(phone_display, index=phone_nums.index)
+
+# --- Filter bitmaps ---
+
+class FilterMasks:
+    """Per-option membership bitmaps for the sidebar filters (Position / Assigned Unit / Office Location).
+
+    A filter is a bitwise AND of (at most) three precomputed boolean arrays plus np.flatnonzero; results
+    for each (position, unit, location) combination are memoized, and shared by every session.
+    """
+
+    def __init__(self, df, cache_size=256):
+        n_rows = len(df)
+        self._n_rows = n_rows
+        self._masks = {
+            'Position': self._value_masks(df['Position'], positions_dict),
+            'Assigned Unit': self._list_masks(df['Assigned Unit'], units_dict),
+            'Office Location': self._value_masks(df['Office Location'], locations_dict),
+        }
+        self._all_rows = np.arange(n_rows)
+        self._all_rows.flags.writeable = False
+        self.rows = lru_cache(maxsize=cache_size)(self._rows)
+
+    @staticmethod
+    def _value_masks(column, options):
+        values = column.to_numpy()
+        keys = set(options).union(column.dropna().unique()) - {'All'}
+        return {key: values == key for key in keys}
+
+    @staticmethod
+    def _list_masks(column, options):
+        keys = set(options).union(*column) - {'All'}
+        masks = {key: np.zeros(len(column), dtype=bool) for key in keys}
+        for row, values in enumerate(column):
+            for value in values:
+                masks[value][row] = True
+        return masks
+
+    def cache_stats(self):
+        """Hit/miss counters of the memoized filter combinations"""
+        cache_info = self.rows.cache_info()
+        return {"hits": cache_info.hits, "misses": cache_info.misses, "entries": cache_info.currsize}
+
+    def mask(self, column, value):
+        """Boolean membership array for one filter option (all False for options not in the roster)"""
+        try:
+            return self._masks[column][value]
+        except KeyError:
+            return np.zeros(self._n_rows, dtype=bool)
+
+    def _rows(self, position='All', unit='All', location='All'):
+        """Row positions (roster order) matching the selected filters; call via `rows(...)` (memoized)"""
+        selected = [
+            self.mask(column, value)
+            for column, value in (('Position', position), ('Assigned Unit', unit), ('Office Location', location))
+            if value != 'All'
+        ]
+        if not selected:
+            return self._all_rows
+        rows = np.flatnonzero(np.logical_and.reduce(selected))
+        rows.flags.writeable = False # Memoized and shared across sessions
+        return rows
+
+
+# --- Directory snapshot ---
+
+# Define prepare_directory_frame()
+def prepare_directory_frame(apa_data):
+    """Copy of `apa_data` with enum arrays parsed and the display fields (badge, location, phone) pre-rendered"""
+    df = apa_data.copy()
+
+    # Parse Postgres enum arrays ('{GCU,SVU}') into lists
+    with metrics.span("snapshot.parse_enums"):
+        df['Assigned Unit'] = df['Assigned Unit'].apply(parse_enum) # unit_enum[]
+        if 'Race' in df: # Not selected by the SQL query mode
+            df['Race'] = df['Race'].apply(parse_enum) # race_enum[]
+
+    # Compact dtypes: categoricals for low-cardinality codes; identical unit lists share one (immutable) tuple
+    df['Position'] = df['Position'].astype('category')
+    df['Office Location'] = df['Office Location'].astype('category')
+    unit_tuples = {}
+    df['Assigned Unit'] = [unit_tuples.setdefault(tuple(units), tuple(units)) for units in df['Assigned Unit']]
+
+    # Pre-rendered display fields (used by display_attorney / contact_directory)
+    with metrics.span("snapshot.format"):
+        df['Badge'] = format_badges(df['Position'], df['Assigned Unit'])
+        df['Location Label'] = format_locations(df['Office Location'])
+        df['Phone Number'], df['Phone Display'] = format_phone_numbers(df['Work Phone #'])
+
+    return df.reset_index(drop=True)
+
+
+class DirectorySnapshot:
+    """Display-ready APA roster for one data version; shared by all sessions, so treat as READ-ONLY"""
+
+    def __init__(self, apa_data, version=None):
+        self.version = version
+        # Roster order == 'Last Name' order, so row-position selections never need re-sorting
+        self.data = prepare_directory_frame(apa_data).sort_values(by='Last Name', kind='stable').reset_index(drop=True)
+
+        # Filter bitmaps + name search index (both return row positions into self.data)
+        self.filter_masks = FilterMasks(self.data)
+        self.search_index = NameSearchIndex(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+# Define build_directory_snapshot()
+@st.cache_resource(show_spinner=False, max_entries=2)
+def build_directory_snapshot(_apa_data, data_version):
+    """Build the shared snapshot ONCE per roster version (older versions are evicted)"""
+    metrics.increment("snapshot.build")
+    with metrics.span("snapshot.build"):
+        directory_snapshot = DirectorySnapshot(_apa_data, version=data_version)
+    metrics.register_collector("filter_cache", directory_snapshot.filter_masks.cache_stats)
+    metrics.register_collector("search_cache", directory_snapshot.search_index.cache_stats)
+    return directory_snapshot
+
+# Define get_directory_snapshot()
+def get_directory_snapshot(_connection_pool):
+    """Shared snapshot of the current roster version; returns None if the roster could not be loaded"""
+    data_version, apa_data = get_apa_roster(_connection_pool)
+    if apa_data is None:
+        return None
+    return build_directory_snapshot(apa_data, data_version)
+
+
+# --- SQL query mode ([directory] query_mode = "sql") --- 
+
+# Define query_directory()
+@st.cache_data(ttl=60, show_spinner=False)
+def query_directory(_directory_query, position='All', unit='All', location='All', searched_text=''):
+    """Display-ready rows matching the filters/search, computed in Postgres (see directory_sql.py); raises on DB errors"""
+    return prepare_directory_frame(_directory_query.fetch(position, unit, location, searched_text))
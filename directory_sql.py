@@ -0,0 +1,212 @@
+"""
+File: directory_sql.py
+Function: SQL pushdown query mode for the court directory -- filters and name search run in Postgres against a
+          projected, indexed materialized view of employee_info_view (pg_trgm + GIN), via prepared statements
+
+Set [directory] query_mode = "sql" in secrets.toml to use it. Create / refresh the view with:
+    python directory_sql.py create
+    python directory_sql.py refresh
+"""
+
+import sys
+import threading
+import time
+
+import streamlit as st
+import pandas as pd
+import psycopg2
+from psycopg2 import pool, sql
+
+from database import ROSTER_COLUMNS, ROSTER_POSITIONS
+
+
+SEARCH_VIEW = "employee_directory_mv"
+
+DIRECTORY_COLUMNS = ROSTER_COLUMNS # Only the columns the court view displays / searches (no Race, etc.)
+SEARCH_COLUMNS = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
+
+
+# Define like_pattern()
+def like_pattern(text):
+    """'%text%' LIKE pattern matching `text` literally (LIKE metacharacters escaped with Postgres' default escape, backslash)"""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# --- Materialized view (DDL / refresh) ---
+
+def create_search_view(conn, key_column="Work Email Address"):
+    """Create the pg_trgm extension, the projected materialized view and its indexes (idempotent)"""
+    view = sql.Identifier(SEARCH_VIEW)
+    # Enum columns are stored as text / text[] so they index, bind and decode (as Python lists) without enum casts
+    cast_columns = {"Position": "text", "Assigned Unit": "text[]", "Office Location": "text"}
+    select_list = sql.SQL(', ').join(
+        sql.SQL("{col}::" + cast_columns[col] + " AS {col}").format(col=sql.Identifier(col)) if col in cast_columns else sql.Identifier(col)
+        for col in DIRECTORY_COLUMNS
+    )
+    search_text = sql.SQL("lower(concat_ws(' ', {cols}))").format(cols=sql.SQL(', ').join(map(sql.Identifier, SEARCH_COLUMNS)))
+    statements = [
+        sql.SQL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+        sql.SQL("CREATE MATERIALIZED VIEW IF NOT EXISTS {view} AS SELECT {select_list}, {search_text} AS search_text FROM employee_info_view WHERE {where_col}::text IN ({positions})").format(
+            view=view,
+            select_list=select_list,
+            search_text=search_text,
+            where_col=sql.Identifier('Position'),
+            positions=sql.SQL(', ').join(map(sql.Literal, ROSTER_POSITIONS)),
+        ),
+        # Unique key -> REFRESH MATERIALIZED VIEW CONCURRENTLY (readers are never blocked)
+        sql.SQL("CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {view} ({key_col})").format(
+            index=sql.Identifier(f"{SEARCH_VIEW}_key"), view=view, key_col=sql.Identifier(key_column)
+        ),
+        sql.SQL("CREATE INDEX IF NOT EXISTS {index} ON {view} USING gin (search_text gin_trgm_ops)").format(
+            index=sql.Identifier(f"{SEARCH_VIEW}_search_trgm"), view=view
+        ),
+        sql.SQL("CREATE INDEX IF NOT EXISTS {index} ON {view} USING gin ({unit_col})").format(
+            index=sql.Identifier(f"{SEARCH_VIEW}_units"), view=view, unit_col=sql.Identifier('Assigned Unit')
+        ),
+        sql.SQL("CREATE INDEX IF NOT EXISTS {index} ON {view} ({position_col}, {location_col})").format(
+            index=sql.Identifier(f"{SEARCH_VIEW}_position_location"), view=view,
+            position_col=sql.Identifier('Position'), location_col=sql.Identifier('Office Location')
+        ),
+    ]
+    with conn.cursor() as cur:
+        for statement in statements:
+            cur.execute(statement)
+    conn.commit()
+
+def refresh_search_view(conn, concurrently=True):
+    """Re-materialize the view from employee_info_view (CONCURRENTLY keeps it readable during the refresh)"""
+    with conn.cursor() as cur:
+        cur.execute(sql.SQL("REFRESH MATERIALIZED VIEW {concurrently} {view}").format(
+            concurrently=sql.SQL("CONCURRENTLY" if concurrently else ""),
+            view=sql.Identifier(SEARCH_VIEW)
+        ))
+    conn.commit()
+
+
+# --- Prepared directory queries ---
+
+class DirectoryQuery:
+    """Runs filter/search queries against the materialized view with server-side prepared statements.
+
+    There is one statement per "shape" (which of position / unit / location / search are active), prepared
+    lazily on each pooled connection (tracked by backend PID) and reused for every later query of that shape.
+    """
+
+    def __init__(self, connection_pool, similarity=0.3, refresh_interval=None):
+        self._pool = connection_pool
+        self.similarity = similarity
+        self.refresh_interval = refresh_interval # Seconds between view refreshes (None: refreshed externally)
+        self._lock = threading.Lock()
+        self._prepared = {} # backend PID -> names of statements prepared on that connection
+        self._refreshed_at = time.monotonic()
+
+    @staticmethod
+    def _statement(position, unit, location, search):
+        """(statement name, SQL with $n placeholders, parameter names) for one query shape"""
+        conditions, params = [], []
+        if position:
+            params.append("position")
+            conditions.append(f'"Position" = ${len(params)}')
+        if unit:
+            params.append("unit")
+            conditions.append(f'"Assigned Unit" @> ARRAY[${len(params)}::text]')
+        if location:
+            params.append("location")
+            conditions.append(f'"Office Location" = ${len(params)}')
+        order_by = '"Last Name"'
+        if search:
+            params += ["pattern", "query"]
+            pattern, query = f"${len(params) - 1}", f"${len(params)}"
+            # LIKE '%text%' and the <% word-similarity operator are both served by the trigram GIN index
+            conditions.append(f"(search_text LIKE {pattern} OR {query} <% search_text)")
+            order_by = f'(search_text LIKE {pattern}) DESC, word_similarity({query}, search_text) DESC, "Last Name"'
+
+        columns = ", ".join(f'"{col}"' for col in DIRECTORY_COLUMNS)
+        where = " AND ".join(conditions) or "TRUE"
+        name = "directory_" + "".join("1" if flag else "0" for flag in (position, unit, location, search))
+        return name, f"SELECT {columns} FROM {SEARCH_VIEW} WHERE {where} ORDER BY {order_by}", params
+
+    def _prepare(self, conn, name, statement):
+        pid = conn.info.backend_pid
+        with self._lock:
+            prepared = self._prepared.setdefault(pid, set())
+            if name in prepared:
+                return
+        with conn.cursor() as cur:
+            cur.execute("SET pg_trgm.word_similarity_threshold = %s", (self.similarity,))
+            cur.execute(f"PREPARE {name} AS {statement}")
+        conn.commit() # Keep the session setting (a rollback would undo it)
+        with self._lock:
+            prepared.add(name)
+
+    def fetch(self, position='All', unit='All', location='All', searched_text=''):
+        """Matching directory rows (projected columns only), ranked by search relevance when searching"""
+        searched_text = " ".join(str(searched_text or "").lower().split())
+        values = {
+            "position": None if position == 'All' else position,
+            "unit": None if unit == 'All' else unit,
+            "location": None if location == 'All' else location,
+            "pattern": like_pattern(searched_text),
+            "query": searched_text,
+        }
+        name, statement, params = self._statement(values["position"], values["unit"], values["location"], searched_text)
+        self._maybe_refresh()
+
+        with self._pool.connection() as conn:
+            for attempt in range(2):
+                self._prepare(conn, name, statement)
+                try:
+                    with conn.cursor() as cur:
+                        placeholders = ", ".join(["%s"] * len(params))
+                        cur.execute(f"EXECUTE {name}" + (f" ({placeholders})" if params else ""), [values[param] for param in params])
+                        columns = [desc.name for desc in cur.description]
+                        rows = cur.fetchall()
+                    break
+                except psycopg2.errors.InvalidSqlStatementName:
+                    # Session was reset (e.g. DISCARD ALL / reconnect) -- prepare again once
+                    conn.rollback()
+                    with self._lock:
+                        self._prepared.pop(conn.info.backend_pid, None)
+                    if attempt:
+                        raise
+        return pd.DataFrame(rows, columns=columns)
+
+    def _maybe_refresh(self):
+        """Refresh the view in the background every `refresh_interval` seconds (one refresh at a time)"""
+        if self.refresh_interval is None or time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        self._refreshed_at = time.monotonic()
+        threading.Thread(target=self._refresh, name="directory-view-refresh", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            with self._pool.connection() as conn:
+                refresh_search_view(conn)
+        except (psycopg2.Error, pool.PoolError) as e:
+            print(f"Directory view refresh failed: {e}")
+
+
+# Define get_directory_query()
+@st.cache_resource
+def get_directory_query(_connection_pool):
+    """Process-wide DirectoryQuery; tuning under [directory] in secrets.toml (search_similarity, view_refresh_interval)"""
+    directory_config = st.secrets.get("directory", {})
+    return DirectoryQuery(
+        _connection_pool,
+        similarity=directory_config.get("search_similarity", 0.3),
+        refresh_interval=directory_config.get("view_refresh_interval", 300.0),
+    )
+
+
+# --- Maintenance entry point ---
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "refresh"
+    with psycopg2.connect(st.secrets["neonDB"]["database_url"]) as maintenance_conn:
+        if command == "create":
+            create_search_view(maintenance_conn, st.secrets.get("roster", {}).get("key_column", "Work Email Address"))
+        elif command == "refresh":
+            refresh_search_view(maintenance_conn)
+        else:
+            sys.exit(f"Unknown command {command!r} (expected 'create' or 'refresh')")
+    print(f"{SEARCH_VIEW}: {command} done")
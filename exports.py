@@ -0,0 +1,72 @@
+"""
+File: exports.py
+Function: Contact Directory table and bulk exports (CSV / vCard), generated once per roster version + filter key
+"""
+
+import streamlit as st
+
+import metrics
+
+
+ORGANIZATION = "Jackson County Prosecuting Attorney's Office"
+
+# Contact Directory columns -> displayed / exported headers
+CONTACT_COLUMNS = {
+    'Full Name': 'Attorney Name',
+    'Work Email Address': 'Email Address',
+    'Phone Number': 'Phone Number',
+}
+
+
+# Define contact_table()
+def contact_table(df):
+    """Contact Directory table (renamed headers) for an already-sorted directory frame"""
+    return df[list(CONTACT_COLUMNS)].rename(columns=CONTACT_COLUMNS)
+
+# Define get_contact_table()
+@st.cache_resource(show_spinner=False, max_entries=64)
+def get_contact_table(_df, data_version, filter_key):
+    """contact_table() built once per (roster version, filter key) and shared by all sessions -- READ-ONLY"""
+    return contact_table(_df)
+
+# Define vcard_escape()
+def vcard_escape(value):
+    """Escape a vCard 3.0 text value (RFC 2426); missing values become ''"""
+    if not isinstance(value, str):
+        return ""
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;").replace("\n", "\\n")
+
+# Define contacts_vcard()
+def contacts_vcard(df):
+    """One vCard 3.0 entry per attorney, as UTF-8 bytes"""
+    cards = []
+    for row in df.itertuples(index=False):
+        fields = dict(zip(df.columns, row))
+        card = [
+            "BEGIN:VCARD",
+            "VERSION:3.0",
+            "N:" + ";".join(vcard_escape(fields.get(col)) for col in ('Last Name', 'First Name', 'Middle Name')) + ";;" + vcard_escape(fields.get('Suffix')),
+            "FN:" + vcard_escape(fields.get('Full Name')),
+            "ORG:" + vcard_escape(ORGANIZATION),
+        ]
+        if isinstance(fields.get('Job Title'), str):
+            card.append("TITLE:" + vcard_escape(fields['Job Title']))
+        if isinstance(fields.get('Work Email Address'), str):
+            card.append("EMAIL;TYPE=INTERNET,WORK:" + vcard_escape(fields['Work Email Address']))
+        if isinstance(fields.get('Phone Number'), str):
+            card.append("TEL;TYPE=WORK,VOICE:" + vcard_escape(fields['Phone Number']))
+        card.append("END:VCARD")
+        cards.append("\r\n".join(card))
+    return ("\r\n".join(cards) + "\r\n").encode("utf-8")
+
+# Define build_contact_export()
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_contact_export(_df, data_version, filter_key, export_format):
+    """Export bytes for one (roster version, filter key, format); shared by every session and re-download"""
+    metrics.increment(f"export.{export_format}")
+    with metrics.span(f"export.{export_format}"):
+        if export_format == "csv":
+            return contact_table(_df).to_csv(index=False).encode("utf-8-sig") # BOM so Excel reads UTF-8
+        elif export_format == "vcf":
+            return contacts_vcard(_df)
+    raise ValueError(f"Unknown export format {export_format!r}")
@@ -0,0 +1,173 @@
+"""
+File: headshots.py
+Function: Headshot manifest -- every headshot's Cloudinary version and intrinsic size, resolved in one bulk listing
+
+The manifest is synced from the Admin API's resource listing (a handful of paged calls for the whole folder, not one
+call per attorney) and stored next to the cached roster. It lets the directory emit versioned headshot URLs, which
+never change for a given image and so can be cached forever, plus width/height hints that reserve each headshot's
+space before it loads. Configured under [photo] in secrets.toml:
+    manifest_refresh = 3600        # seconds between background syncs; 0 disables the manifest
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+import metrics
+
+
+logger = logging.getLogger("court_directory.headshots")
+
+HEADSHOT_FOLDER = "JCPAO_headshots"
+MANIFEST_FILE = "headshots.json"
+PAGE_SIZE = 500 # Admin API maximum per listing call
+RETRY_DELAY = 60.0 # First wait after a failed sync; doubles per consecutive failure, up to refresh_interval
+
+
+# Define headshot_public_id()
+def headshot_public_id(photo_id):
+    """Cloudinary public ID of a roster PhotoID"""
+    return f"{HEADSHOT_FOLDER}/{photo_id}"
+
+# Define cloudinary_resources()
+def cloudinary_resources(**options):
+    """Admin API resource listing (cloudinary.api.resources)"""
+    import cloudinary.api
+    return cloudinary.api.resources(**options)
+
+# Define list_headshots()
+def list_headshots(list_resources, folder=HEADSHOT_FOLDER):
+    """{public_id: {"version", "width", "height"}} for every uploaded image in `folder`, following next_cursor pages"""
+    entries = {}
+    options = {"type": "upload", "resource_type": "image", "prefix": f"{folder}/", "max_results": PAGE_SIZE}
+    while True:
+        with metrics.span("headshots.list_page"):
+            page = list_resources(**options)
+        for resource in page.get("resources", []):
+            entries[resource["public_id"]] = {
+                "version": resource.get("version"),
+                "width": resource.get("width"),
+                "height": resource.get("height"),
+            }
+        if not page.get("next_cursor"):
+            return entries
+        options["next_cursor"] = page["next_cursor"]
+
+# Define headshot_display_size()
+def headshot_display_size(entry, max_width):
+    """(width, height) a manifest entry renders at with crop="limit" to `max_width` (never upscaled); None if unknown"""
+    if not entry or not entry.get("width") or not entry.get("height"):
+        return None
+    width, height = entry["width"], entry["height"]
+    if width > max_width:
+        width, height = max_width, round(height * max_width / width)
+    return width, height
+
+
+class HeadshotManifest:
+    """Persisted headshot manifest, served stale while a background sync refreshes it every `refresh_interval` seconds.
+
+    The file is written to a temp file and renamed into place, so workers sharing the roster directory read either
+    the old or the new manifest, and a worker that finds a fresh file on disk does not sync again.
+    """
+
+    def __init__(self, path, list_resources=None, refresh_interval=3600.0, folder=HEADSHOT_FOLDER):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.list_resources = list_resources # None: cloudinary_resources
+        self.refresh_interval = refresh_interval
+        self.folder = folder
+        self._lock = threading.Lock()
+        self._syncing = False
+        self._entries = {}
+        self._synced_at = float("-inf")
+        self._next_attempt = float("-inf") # Backoff after failed syncs (the Admin API is rate limited)
+        self._consecutive_failures = 0
+        self.syncs = 0
+        self.failures = 0
+        self._load()
+
+    def get(self, public_id):
+        """{"version", "width", "height"} of a headshot (public ID with or without file extension), or None"""
+        self._refresh_in_background()
+        entry = self._entries.get(public_id)
+        if entry is None:
+            entry = self._entries.get(os.path.splitext(public_id)[0])
+        return entry
+
+    def sync(self):
+        """List the folder now and persist the result; keeps the previous manifest if the listing fails"""
+        try:
+            entries = list_headshots(self.list_resources or cloudinary_resources, self.folder)
+        except Exception as e:
+            self.failures += 1
+            self._consecutive_failures += 1
+            retry_delay = min(self.refresh_interval, RETRY_DELAY * 2 ** (self._consecutive_failures - 1))
+            self._next_attempt = time.time() + retry_delay
+            metrics.increment("headshots.sync_error")
+            logger.warning(f"Headshot manifest sync failed (retrying in {retry_delay:.0f} s): {e}")
+            return False
+        self._consecutive_failures = 0
+        self._next_attempt = float("-inf")
+        self._entries, self._synced_at = entries, time.time()
+        self._save()
+        self.syncs += 1
+        metrics.increment("headshots.sync")
+        return True
+
+    def is_stale(self):
+        return time.time() - self._synced_at >= self.refresh_interval
+
+    def stats(self):
+        return {"entries": len(self._entries), "age_s": max(0.0, time.time() - self._synced_at), "syncs": self.syncs, "failures": self.failures}
+
+    def _refresh_in_background(self):
+        if not self.is_stale() or time.time() < self._next_attempt:
+            return
+        with self._lock:
+            if self._syncing:
+                return
+            self._syncing = True
+        threading.Thread(target=self._background_sync, name="headshot-manifest", daemon=True).start()
+
+    def _background_sync(self):
+        try:
+            self._load() # Another worker may have synced the shared file already
+            if self.is_stale():
+                self.sync()
+        finally:
+            self._syncing = False
+
+    def _load(self):
+        try:
+            manifest = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if manifest.get("synced_at", float("-inf")) > self._synced_at:
+            self._entries, self._synced_at = manifest["entries"], manifest["synced_at"]
+
+    def _save(self):
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w") as sink:
+            json.dump({"synced_at": self._synced_at, "entries": self._entries}, sink)
+        os.replace(temp_path, self.path)
+
+
+# Define get_headshot_manifest()
+@st.cache_resource(show_spinner=False)
+def get_headshot_manifest():
+    """Process-wide HeadshotManifest stored in the roster directory; None when disabled ([photo] manifest_refresh = 0)"""
+    from database import roster_store_dir
+
+    refresh_interval = st.secrets.get("photo", {}).get("manifest_refresh", 3600.0)
+    if not refresh_interval:
+        return None
+    manifest = HeadshotManifest(Path(roster_store_dir() or ".cache/roster") / MANIFEST_FILE, refresh_interval=refresh_interval)
+    metrics.register_collector("headshots", manifest.stats)
+    return manifest
@@ -0,0 +1,187 @@
+"""
+File: metrics.py
+Function: Lightweight timing spans / counters for the court directory, exported as Prometheus text
+          (optional HTTP endpoint), structured logs and the admin-only metrics page
+
+Configured under [metrics] in secrets.toml:
+    enabled = true                 # spans/counters are no-ops when false (default)
+    log_spans = false              # one JSON log line per span
+    prometheus_port = 9464         # serve GET /metrics from a background thread (omit to disable); with several
+                                   # worker processes only the first to bind the port serves it
+    admin_emails = ["..."]         # verified users who see the metrics page
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+
+logger = logging.getLogger("court_directory.metrics")
+span_logger = logging.getLogger("court_directory.metrics.spans") # JSON lines only; handler attached by configure_metrics()
+
+_NOOP_SPAN = nullcontext()
+_enabled = False
+_log_spans = False
+_lock = threading.Lock()
+_spans = {} # span name -> {"count", "total", "max", "recent": deque of seconds}
+_counters = Counter()
+_collectors = {} # component name -> zero-arg callable returning {stat: number}
+
+
+# --- Recording ---
+
+def span(name):
+    """Context manager timing the enclosed block as `name` (a shared no-op when metrics are off)"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _timed(name)
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def record(name, seconds):
+    """Record one `seconds` observation for span `name`"""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = {"count": 0, "total": 0.0, "max": 0.0, "recent": deque(maxlen=1024)}
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["recent"].append(seconds)
+    if _log_spans:
+        span_logger.info(json.dumps({"span": name, "ms": round(seconds * 1000, 3)}))
+
+def increment(name, n=1):
+    """Add `n` to counter `name`"""
+    if _enabled:
+        with _lock:
+            _counters[name] += n
+
+def register_collector(component, collect):
+    """Export `collect()` (a dict of numeric stats, e.g. a cache's stats()) as gauges labelled with `component`"""
+    _collectors[component] = collect
+
+
+# --- Reading ---
+
+def active_sessions():
+    """Connected browser sessions in this server process (None outside a Streamlit server)"""
+    try:
+        from streamlit import runtime
+        return runtime.get_instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return None
+
+def snapshot():
+    """{"spans": {name: {count, total_ms, avg_ms, p50_ms, p95_ms, max_ms}}, "counters": {...}, "components": {...}}"""
+    with _lock:
+        spans = {name: dict(stats, recent=list(stats["recent"])) for name, stats in _spans.items()}
+        counters = dict(_counters)
+    import numpy as np # Deferred: only the metrics page / endpoint need it
+    span_stats = {}
+    for name, stats in sorted(spans.items()):
+        recent = np.array(stats["recent"]) * 1000
+        span_stats[name] = {
+            "count": stats["count"],
+            "total_ms": stats["total"] * 1000,
+            "avg_ms": stats["total"] * 1000 / stats["count"],
+            "p50_ms": float(np.percentile(recent, 50)),
+            "p95_ms": float(np.percentile(recent, 95)),
+            "max_ms": stats["max"] * 1000,
+        }
+    components = {}
+    for component, collect in list(_collectors.items()):
+        try:
+            components[component] = {stat: value for stat, value in collect().items() if isinstance(value, (int, float))}
+        except Exception as e:
+            components[component] = {"collector_errors": 1}
+            logger.warning(f"Metrics collector {component!r} failed: {e}")
+    sessions = active_sessions()
+    if sessions is not None:
+        components["streamlit"] = {"active_sessions": sessions}
+    return {"spans": span_stats, "counters": counters, "components": components}
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = [
+        "# HELP court_directory_span_seconds Duration of instrumented spans (quantiles over the last 1024 observations).",
+        "# TYPE court_directory_span_seconds summary",
+    ]
+    for name, stats in data["spans"].items():
+        lines.append(f'court_directory_span_seconds{{span="{name}",quantile="0.5"}} {stats["p50_ms"] / 1000:.6f}')
+        lines.append(f'court_directory_span_seconds{{span="{name}",quantile="0.95"}} {stats["p95_ms"] / 1000:.6f}')
+        lines.append(f'court_directory_span_seconds_sum{{span="{name}"}} {stats["total_ms"] / 1000:.6f}')
+        lines.append(f'court_directory_span_seconds_count{{span="{name}"}} {stats["count"]}')
+    lines += ["# HELP court_directory_events_total Instrumented event counters.", "# TYPE court_directory_events_total counter"]
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f'court_directory_events_total{{event="{name}"}} {value}')
+    lines += ["# HELP court_directory_component Component stats (pools, caches, queues).", "# TYPE court_directory_component gauge"]
+    for component, stats in sorted(data["components"].items()):
+        for stat, value in sorted(stats.items()):
+            lines.append(f'court_directory_component{{component="{component}",stat="{stat}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+# --- Configuration / HTTP endpoint ---
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Define configure_metrics()
+@st.cache_resource
+def configure_metrics():
+    """Apply [metrics] settings once per process; starts the Prometheus endpoint if a port is configured"""
+    global _enabled, _log_spans
+    metrics_config = st.secrets.get("metrics", {})
+    _enabled = bool(metrics_config.get("enabled", False))
+    _log_spans = bool(metrics_config.get("log_spans", False))
+    if _log_spans and not span_logger.handlers:
+        # Own handler + level: the app's loggers have none, and the root logger (WARNING) would drop INFO lines
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        span_logger.addHandler(handler)
+        span_logger.setLevel(logging.INFO)
+        span_logger.propagate = False
+    port = metrics_config.get("prometheus_port")
+    if _enabled and port:
+        try:
+            server = ThreadingHTTPServer((metrics_config.get("prometheus_host", "127.0.0.1"), int(port)), _MetricsHandler)
+        except OSError as e:
+            # E.g. another worker process on this host already serves the port; run on without an endpoint
+            logger.warning(f"Metrics endpoint not started on port {port}: {e}")
+        else:
+            threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    return {"enabled": _enabled, "admin_emails": [email.lower() for email in metrics_config.get("admin_emails", [])]}
+
+def is_metrics_admin(email):
+    """True if metrics are on and `email` is listed under [metrics] admin_emails"""
+    metrics_settings = configure_metrics()
+    return metrics_settings["enabled"] and bool(email) and email.strip().lower() in metrics_settings["admin_emails"]
@@ -1,6 +1,11 @@
+from functools import lru_cache
+
 import streamlit as st
 import cloudinary
 
+import metrics
+from photo_cache import PhotoCache
+
 config = cloudinary.config(
     cloud_name = st.secrets["cloudinary"]["CLOUD_NAME"], 
     api_key = st.secrets["cloudinary"]["API_KEY"],
@@ -11,7 +16,80 @@ config = cloudinary.config(
 # import cloudinary.uploader
 # import cloudinary.api
 
+# --- Image variants --- 
+
+HEADSHOT_WIDTH = 400 # Display width (CSS px) of headshots in the Main Directory
+VARIANT_DPRS = (1, 2) # Device-pixel-ratio variants offered via srcset
+
 # Define load_photo() 
-def load_photo(public_id):
-    """Loads photo from Cloudinary with the provided public ID; returns img src URL that can be read into st.image()/st.markdown()"""
-    return cloudinary.CloudinaryImage(public_id).build_url()
\ No newline at end of file
+@lru_cache(maxsize=4096)
+def load_photo(public_id, width=None, height=None, crop="limit", dpr=None, fetch_format="auto", quality="auto", version=None):
+    """Loads photo from Cloudinary with the provided public ID; returns img src URL that can be read into st.image()/st.markdown()
+
+    The URL asks Cloudinary for a server-side resized (width/height + crop; "limit" never upscales), format-negotiated
+    (f_auto -> WebP/AVIF where supported) and quality-tuned (q_auto) variant. URLs are memoized per public ID and size.
+    With a `version` (see headshots.py) the URL is immutable -- a replaced image gets a new URL -- so it is safe to cache forever.
+    """
+    options = {"fetch_format": fetch_format, "quality": quality}
+    if version is not None:
+        options["version"] = version
+    if width is not None:
+        options["width"] = width
+    if height is not None:
+        options["height"] = height
+    if width is not None or height is not None:
+        options["crop"] = crop
+        if crop in ("fill", "thumb", "crop"):
+            options["gravity"] = "face" # Keep the face centered when cropping headshots
+    if dpr is not None:
+        options["dpr"] = f"{float(dpr):.1f}"
+    return cloudinary.CloudinaryImage(public_id).build_url(**options)
+
+# Define photo_srcset()
+@lru_cache(maxsize=4096)
+def photo_srcset(public_id, width, height=None, crop="limit", dprs=VARIANT_DPRS, version=None):
+    """`srcset` attribute value offering one variant per device-pixel ratio (e.g. '<url> 1x, <url> 2x')"""
+    return ", ".join(f"{load_photo(public_id, width, height, crop, dpr, version=version)} {dpr}x" for dpr in dprs)
+
+# Define photo_img_tag()
+def photo_img_tag(public_id, width, height=None, crop="limit", lazy=True, style=None, version=None, display_size=None):
+    """<img> HTML for st.markdown(..., unsafe_allow_html=True) with a resized src and DPR srcset
+
+    `display_size` = (width, height) of the rendered variant, emitted as width/height attributes so the browser
+    reserves the space before the image arrives (no layout shift).
+    """
+    style = style or f"width: 100%; max-width: {width}px;" + (" height: auto;" if display_size else "")
+    loading = " loading='lazy' decoding='async'" if lazy else ""
+    size = f" width='{display_size[0]}' height='{display_size[1]}'" if display_size else ""
+    return (
+        f"<img src='{load_photo(public_id, width, height, crop, VARIANT_DPRS[0], version=version)}' srcset='{photo_srcset(public_id, width, height, crop, version=version)}'"
+        f"{size}{loading} style='{style}'>"
+    )
+
+
+# --- Local headshot cache (optional) --- 
+
+# Define get_photo_cache()
+@st.cache_resource
+def get_photo_cache():
+    """Process-local PhotoCache when [photo] cache_mode = "local" in secrets.toml; None (browser loads from Cloudinary) otherwise"""
+    photo_config = st.secrets.get("photo", {})
+    if photo_config.get("cache_mode", "cdn") != "local":
+        return None
+    photo_cache = PhotoCache(
+        photo_config.get("cache_dir", ".cache/headshots"),
+        max_bytes=int(photo_config.get("cache_max_mb", 200)) * 1024 * 1024,
+        revalidate_after=photo_config.get("revalidate_after", 3600.0),
+        timeout=photo_config.get("fetch_timeout", 5.0),
+        backoff=photo_config.get("cdn_backoff", 60.0),
+    )
+    metrics.register_collector("photo_cache", photo_cache.stats)
+    return photo_cache
+
+# Define load_photo_bytes()
+def load_photo_bytes(public_id, width=None, height=None, crop="limit", version=None):
+    """Image bytes of a (2x DPR) variant, served through the local cache; None when the cache is off or the image is unavailable"""
+    photo_cache = get_photo_cache()
+    if photo_cache is None:
+        return None
+    return photo_cache.get(load_photo(public_id, width, height, crop, VARIANT_DPRS[-1], version=version), immutable=version is not None)
@@ -0,0 +1,200 @@
+"""
+File: photo_cache.py
+Function: Process-local, on-disk headshot byte cache (size-capped LRU, ETag / Last-Modified revalidation)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from resilience import CircuitBreaker
+
+
+class PhotoCache:
+    """On-disk cache of image bytes keyed by URL.
+
+    Fresh entries (validated within `revalidate_after` seconds) are served straight from disk; stale entries are
+    revalidated with If-None-Match / If-Modified-Since, and still served if the CDN is slow or unreachable.
+    Least-recently-used files are evicted once the cache grows past `max_bytes`.
+    After `failure_threshold` consecutive connection failures a host is skipped for `backoff` seconds (per-host
+    circuit breaker), so misses return immediately -- and the page falls back to the CDN URL -- while it is unreachable.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, revalidate_after=3600.0, timeout=5.0, failure_threshold=2, backoff=60.0):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self._breakers = {} # host -> CircuitBreaker
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._entries = OrderedDict() # key -> {"size", "etag", "last_modified", "validated_at"}; oldest use first
+        self._load_index()
+
+    # --- Public API ---
+
+    def get(self, url, immutable=False):
+        """Image bytes for `url` (from cache when possible); None if it can't be fetched and isn't cached
+
+        `immutable` URLs (versioned headshots) never change, so a cached copy is served without revalidation.
+        """
+        key = hashlib.sha256(url.encode()).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None and (immutable or time.time() - entry["validated_at"] < self.revalidate_after):
+            data = self._read(key)
+            if data is not None:
+                self._count("hits")
+                return data
+
+        breaker = self._breaker(url)
+        if not breaker.allow():
+            self._count("skipped") # Host backing off: no network wait
+            return self._stale(key, entry)
+        try:
+            status, data, headers = self._fetch(url, entry)
+        except HTTPError:
+            breaker.record_success() # The host answered (e.g. 404)
+            self._count("errors")
+            return self._stale(key, entry)
+        except (URLError, OSError):
+            breaker.record_failure()
+            self._count("errors")
+            return self._stale(key, entry)
+        breaker.record_success()
+
+        if status == 304:
+            data = self._read(key)
+            if data is not None:
+                self._count("revalidated")
+                with self._lock:
+                    entry["validated_at"] = time.time()
+                    self._save_index()
+                return data
+            status, data, headers = self._fetch(url, None) # Cached file went missing; fetch unconditionally
+
+        self._count("misses" if entry is None else "refreshed")
+        self._store(key, data, headers)
+        return data
+
+    def stats(self):
+        """Counters (hits / misses / revalidated / refreshed / stale_hits / errors / skipped / evictions) plus current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = sum(entry["size"] for entry in self._entries.values())
+        return stats
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._save_index()
+
+    # --- Internals ---
+
+    def _breaker(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.backoff, name="photo_cdn")
+        return breaker
+
+    def _stale(self, key, entry):
+        data = self._read(key) if entry is not None else None
+        if data is not None:
+            self._count("stale_hits") # CDN unreachable: keep serving the copy we have
+        return data
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _fetch(self, url, entry):
+        headers = {"User-Agent": "jcpao-court-directory"}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            with urlopen(Request(url, headers=headers), timeout=self.timeout) as response:
+                return response.status, response.read(), response.headers
+        except HTTPError as e:
+            if e.code == 304:
+                return 304, None, e.headers
+            raise
+
+    def _path(self, key):
+        return self.cache_dir / key
+
+    def _read(self, key):
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _store(self, key, data, headers):
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._entries[key] = {
+                "size": len(data),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "validated_at": time.time(),
+            }
+            self._entries.move_to_end(key)
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            total -= self._entries[key]["size"]
+            self._remove(key)
+            self._counters["evictions"] += 1
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _load_index(self):
+        try:
+            entries = json.loads((self.cache_dir / self.INDEX_FILE).read_text())
+        except (OSError, ValueError):
+            return
+        for key, entry in entries:
+            if self._path(key).exists():
+                self._entries[key] = entry
+
+    def _save_index(self):
+        index_path = self.cache_dir / self.INDEX_FILE
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(list(self._entries.items())))
+        os.replace(tmp_path, index_path)
@@ -0,0 +1,136 @@
+"""
+File: resilience.py
+Function: Retry-with-backoff, circuit breaker and business-hours keepalive for the (scale-to-zero) Neon database;
+          the circuit breaker also guards headshot fetches from the image CDN (photo_cache.py)
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+import metrics
+
+
+logger = logging.getLogger("court_directory.resilience")
+
+
+# Define retry_with_backoff()
+def retry_with_backoff(operation, retry_on, attempts=3, base_delay=0.2, max_delay=2.0):
+    """Call `operation()`, retrying exceptions in `retry_on` with exponential backoff and full jitter"""
+    for attempt in range(attempts):
+        try:
+            return operation()
+        except retry_on:
+            if attempt == attempts - 1:
+                raise
+            metrics.increment("db.retry")
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+
+class CircuitBreaker:
+    """closed -> (failure_threshold consecutive failures) -> open: calls fail fast for reset_timeout seconds ->
+    half-open: one trial call is let through; success closes the breaker, failure re-opens it."""
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, name="db"):
+        self.name = name # Log / metric label ("<name>.circuit_open")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        """True if a call may go ahead now (always when closed; one trial call at a time when half-open)"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info(f"Circuit {self.name!r} closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit {self.name!r} opened after {self._failures} consecutive failures")
+                    metrics.increment(f"{self.name}.circuit_open")
+                self._opened_at = time.monotonic() # (Re)start the open period
+
+    def retry_after(self):
+        """Seconds until the breaker lets a trial call through (0 when not open)"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def stats(self):
+        return {"state_open": int(self.state != "closed"), "consecutive_failures": self._failures}
+
+
+class Keepalive:
+    """Background `SELECT 1` every `interval` seconds during business hours, so a scale-to-zero compute is not
+    suspended while people are likely to use the directory (and is left to suspend overnight / on weekends)."""
+
+    def __init__(self, connection_pool, interval=240.0, hours=(7, 18), weekdays=(0, 1, 2, 3, 4), timezone=None):
+        self._pool = connection_pool
+        self.interval = interval
+        self.hours = hours
+        self.weekdays = weekdays
+        self.timezone = timezone
+        self._stop = threading.Event()
+        self.pings = 0
+        self.failures = 0
+
+    def start(self):
+        threading.Thread(target=self._run, name="db-keepalive", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def in_business_hours(self, now=None):
+        if now is None:
+            if self.timezone:
+                from zoneinfo import ZoneInfo
+                now = datetime.now(ZoneInfo(self.timezone))
+            else:
+                now = datetime.now()
+        return now.weekday() in self.weekdays and self.hours[0] <= now.hour < self.hours[1]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.in_business_hours():
+                continue
+            try:
+                with self._pool.connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    conn.rollback()
+                self.pings += 1
+                metrics.increment("db.keepalive")
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Keepalive ping failed: {e}")
+
+    def stats(self):
+        return {"pings": self.pings, "failures": self.failures, "business_hours": int(self.in_business_hours())}
@@ -0,0 +1,168 @@
+"""
+File: search.py
+Function: Prebuilt name search index for the APA directory (substring/prefix lookups + typo-tolerant trigram matching)
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+SEARCH_COLUMNS = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
+
+# Match ranks (higher sorts first)
+EXACT, PREFIX, SUBSTRING = 3, 2, 1
+
+# Query words this short (3+ letters) get too few trigrams for Jaccard similarity ("jon" vs "john" is 0.29); they
+# also match names one edit away (insert / delete / substitute / swap adjacent letters)
+SHORT_WORD = 5
+
+
+def _trigrams(text):
+    """Trigrams of `text` as-is (used for substring candidate lookup)"""
+    return {text[i:i+3] for i in range(len(text) - 2)}
+
+def _within_one_edit(a, b):
+    """True if `a` and `b` differ by at most one insertion, deletion, substitution or adjacent transposition"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i+1:] == b[i+1:] or (a[i:i+2] == b[i:i+2][::-1] and a[i+2:] == b[i+2:])
+    return a[i:] == b[i+1:]
+
+def _word_trigrams(word):
+    """pg_trgm-style padded trigrams of a single word (used for typo-tolerant matching)"""
+    padded = f"  {word} "
+    return frozenset(padded[i:i+3] for i in range(len(padded) - 2))
+
+
+class NameSearchIndex:
+    """Name search over the directory roster, built once per snapshot and read-only afterwards.
+
+    search() returns row POSITIONS (into the frame the index was built from) ranked by:
+    exact name/word match > prefix match > substring match > fuzzy (trigram similarity) match,
+    with ties kept in roster order (Last Name).
+    """
+
+    def __init__(self, df, columns=SEARCH_COLUMNS, min_similarity=0.3, cache_size=512):
+        self.min_similarity = min_similarity
+        self._values = [] # per row: lowercased, non-empty name values
+        self._words = [] # per row: set of name words
+        self._trigram_rows = defaultdict(set) # raw trigram -> rows (substring candidates)
+        self._word_rows = defaultdict(set) # word -> rows
+        self._word_trigrams = {} # word -> padded trigrams
+        self._trigram_words = defaultdict(set) # padded trigram -> words (fuzzy candidates)
+
+        columns = [col for col in columns if col in df]
+        for row, names in enumerate(df[columns].itertuples(index=False, name=None)):
+            values = [str(value).strip().lower() for value in names if not pd.isna(value) and str(value).strip()]
+            words = {word for value in values for word in value.replace(',', ' ').split()}
+            self._values.append(values)
+            self._words.append(words)
+            for value in values:
+                for trigram in _trigrams(value):
+                    self._trigram_rows[trigram].add(row)
+            for word in words:
+                self._word_rows[word].add(row)
+                if word not in self._word_trigrams:
+                    self._word_trigrams[word] = _word_trigrams(word)
+                    for trigram in self._word_trigrams[word]:
+                        self._trigram_words[trigram].add(word)
+
+        self._all_rows = np.arange(len(self._values))
+        self._all_rows.flags.writeable = False
+        self._search = lru_cache(maxsize=cache_size)(self._ranked)
+
+    def __len__(self):
+        return len(self._values)
+
+    def cache_stats(self):
+        """Hit/miss counters of the memoized query results"""
+        cache_info = self._search.cache_info()
+        return {"hits": cache_info.hits, "misses": cache_info.misses, "entries": cache_info.currsize}
+
+    def search(self, text, within=None, fuzzy=True):
+        """Ranked row positions matching `text`; `within` optionally restricts results to the given row positions"""
+        query = " ".join(str(text).lower().split())
+        if not query:
+            ranked = self._all_rows
+        else:
+            ranked = self._search(query, fuzzy)
+        if within is not None:
+            ranked = ranked[np.isin(ranked, within)]
+        return ranked
+
+    # --- Lookup internals ---
+
+    def _substring_rank(self, row, query):
+        values, words = self._values[row], self._words[row]
+        if query in values or query in words:
+            return EXACT
+        if any(value.startswith(query) for value in values) or any(word.startswith(query) for word in words):
+            return PREFIX
+        if any(query in value for value in values):
+            return SUBSTRING
+        return 0
+
+    def _substring_matches(self, query):
+        trigrams = _trigrams(query)
+        if trigrams:
+            candidates = set.intersection(*(self._trigram_rows.get(trigram, set()) for trigram in trigrams))
+        else:
+            candidates = range(len(self._values)) # 1-2 character queries: scan the (small) precomputed lists
+        matches = {}
+        for row in candidates:
+            rank = self._substring_rank(row, query)
+            if rank:
+                matches[row] = rank
+        return matches
+
+    def _similar_words(self, word):
+        """Indexed words whose trigram (Jaccard) similarity to `word` clears min_similarity (short words: or that are
+        one edit away, scored at min_similarity)"""
+        trigrams = _word_trigrams(word)
+        shared = defaultdict(int)
+        for trigram in trigrams:
+            for candidate in self._trigram_words.get(trigram, ()):
+                shared[candidate] += 1
+        similar = {}
+        for candidate, count in shared.items():
+            similarity = count / len(trigrams | self._word_trigrams[candidate])
+            if similarity >= self.min_similarity:
+                similar[candidate] = similarity
+            elif 3 <= len(word) <= SHORT_WORD and _within_one_edit(word, candidate): # 1-2 letters: still typing
+                similar[candidate] = self.min_similarity
+        return similar
+
+    def _fuzzy_matches(self, query):
+        """Rows where EVERY query word is close to some name word; scored by the weakest word match"""
+        scores = None
+        for word in query.replace(',', ' ').split():
+            word_scores = {}
+            for candidate, similarity in self._similar_words(word).items():
+                for row in self._word_rows[candidate]:
+                    if similarity > word_scores.get(row, 0):
+                        word_scores[row] = similarity
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {row: min(score, word_scores[row]) for row, score in scores.items() if row in word_scores}
+            if not scores:
+                break
+        return scores or {}
+
+    def _ranked(self, query, fuzzy):
+        matches = {row: float(rank) for row, rank in self._substring_matches(query).items()}
+        if fuzzy:
+            for row, similarity in self._fuzzy_matches(query).items():
+                matches.setdefault(row, similarity) # similarity < 1 always ranks below substring hits
+        ranked = np.array(sorted(matches, key=lambda row: (-matches[row], row)), dtype=np.intp)
+        ranked.flags.writeable = False # Cached and shared across sessions
+        return ranked
@@ -0,0 +1,116 @@
+"""
+File: shared_roster.py
+Function: Versioned, memory-mapped roster files (Arrow IPC) shared by every app worker process on a host
+
+One worker at a time (file lock) checks Postgres and publishes a new roster version; the others memory-map the
+published file and swap to it when the pointer moves. Enabled by setting a directory under [roster] in secrets.toml:
+    shared_dir = "/dev/shm/court-directory"
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+import metrics
+
+
+# String columns stay Arrow-backed (read straight from the mapped file); other types convert as usual
+_ARROW_STRINGS = {
+    pa.string(): pd.ArrowDtype(pa.string()),
+    pa.large_string(): pd.ArrowDtype(pa.large_string()),
+}
+
+
+class SharedRosterStore:
+    """Roster versions as immutable `roster-<digest>.arrow` files plus a `current.json` pointer.
+
+    Files and pointer are written to a temp file and renamed into place, so readers only ever see complete
+    versions. Superseded files are unlinked; workers still mapping them keep reading until they swap.
+    """
+
+    POINTER = "current.json"
+    LOCK = "refresh.lock"
+
+    def __init__(self, directory, keep=2):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+
+    def current(self):
+        """{"version", "file", "checked_at"} of the published roster, or None before the first publish"""
+        try:
+            return json.loads((self.directory / self.POINTER).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load(self, pointer):
+        """(version, DataFrame) memory-mapped from the pointer's file -- shared pages, so treat as READ-ONLY"""
+        with metrics.span("roster.shared_load"):
+            source = pa.memory_map(str(self.directory / pointer["file"]))
+            table = pa.ipc.open_file(source).read_all()
+            df = table.to_pandas(types_mapper=_ARROW_STRINGS.get)
+        metrics.increment("roster.shared_load")
+        return pointer["version"], df
+
+    def publish(self, version, df):
+        """Write `df` as the new current version and return it memory-mapped from the published file"""
+        with metrics.span("roster.shared_publish"):
+            file_name = f"roster-{hashlib.md5(str(version).encode()).hexdigest()}.arrow"
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with self._atomic_write(file_name) as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            pointer = {"version": version, "file": file_name, "checked_at": time.time()}
+            self._write_pointer(pointer)
+            self._prune()
+        metrics.increment("roster.shared_publish")
+        return self.load(pointer)[1]
+
+    def touch(self):
+        """Mark the current version as just checked against Postgres (no new version)"""
+        pointer = self.current()
+        if pointer is not None:
+            pointer["checked_at"] = time.time()
+            self._write_pointer(pointer)
+
+    @contextmanager
+    def refresh_lock(self, blocking=True):
+        """Cross-process lock held by the worker that talks to Postgres; yields False if non-blocking and taken"""
+        with open(self.directory / self.LOCK, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _atomic_write(self, file_name):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                yield sink
+            os.replace(temp_path, self.directory / file_name)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def _write_pointer(self, pointer):
+        with self._atomic_write(self.POINTER) as sink:
+            sink.write(json.dumps(pointer).encode())
+
+    def _prune(self):
+        versions = sorted(self.directory.glob("roster-*.arrow"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in versions[self.keep:]:
+            path.unlink(missing_ok=True)
@@ -5,24 +5,28 @@ Author: Joseph Cho, ujcho@jacksongov.org
 Date: April 12, 2025
 """
 
-from pathlib import Path
+import hmac
 import time
 import streamlit as st
-from psycopg2 import pool, OperationalError
 # import pandas as pd
 # from datetime import datetime, timezone
 
-from database import external_log_activity
-from photo import load_photo
+import metrics
+from throttle import attempt_checks, reset_attempts
+from warmup import start_warmup
+from branding import asset_url, logo_img_tag
+from access_token import grant_access_token, is_court_email, keep_access_token, restore_access_token
+# database / audit_log / photo (pandas, psycopg2, cloudinary) are imported on first use, so a fresh process can
+# render the verification portal right away; warmup.py loads them in the background
 
 
-# --- Configure Streamlit page settings --- 
+rerun_start = time.perf_counter()
 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
+# --- Configure Streamlit page settings --- 
 
 st.set_page_config(
     page_title="JCPAO Court Directory", # court-view only
-    page_icon=jcpao_logo, # cloudinary.CloudinaryImage('jcpao_logo_200x200').build_url()
+    page_icon=asset_url("favicon", absolute=True), # 48px static favicon (see branding.py)
     layout="wide", # "centered" or "wide"
     initial_sidebar_state="expanded",
     menu_items={
@@ -35,24 +39,18 @@ st.set_page_config(
 
 # --- Initialize requisite functions --- 
 
-# Define get_database_session() 
-@st.cache_resource
-def get_database_session(database_url):
-    try: 
-        # Create a database session object that points to the URL.
-        return pool.SimpleConnectionPool(1, 10, database_url) # Initialize connection pool
-    except OperationalError as e:
-        st.error("Network is blocking connection to the database server. Please try again on a different network/internet connection, or reach out to admin at ujcho@jacksongov.org.")
-        return None
-
-# Establish NEON database connection (via psycopg2)
+metrics.configure_metrics() # [metrics] settings (instrumentation is a no-op unless enabled)
+
+# Open the pool, load the roster and resolve image URLs in the background (once per process)
+start_warmup()
+
+# Establish NEON database connection (via psycopg2) -- opened by the warmup; reused from the cache afterwards
 database_url = st.secrets["neonDB"]["database_url"]
 
-try:
-    db_connection = get_database_session(database_url)
-except Exception as e:
-    print(f"{e}")
-    st.stop()
+# Define get_db_connection()
+def get_db_connection():
+    from database import get_database_session
+    return get_database_session(database_url)
 
 
 # --- Initialize session state ---
@@ -65,23 +63,52 @@ if "verified_email" not in st.session_state:
 if "security_code" not in st.session_state:
     st.session_state["security_code"] = None
 
+# Verified identity -- a non-widget key, since the portal's "verified_email" input (and its state) is gone once verified
+if "verified_user" not in st.session_state:
+    st.session_state["verified_user"] = None
+
+# Reload / new tab / reconnect with a valid access token: verified locally, no portal and no new audit-log row
+if not st.session_state["verified"]:
+    token_email = restore_access_token()
+    if token_email is not None:
+        st.session_state["verified"] = True
+        st.session_state["verified_user"] = token_email
+
 
 # --- Initialize st callback functions --- 
 
 # Define attempt_verification()
 def verify_attempt():
 
+    verified_email = (st.session_state["verified_email"] or "").strip()
+    throttle_checks = attempt_checks(verified_email, st.context.ip_address)
+
+    # Cheap rejection of repeated failures -- before any secret comparison or DB work
+    retry_after = max(attempt_throttle.retry_after(key) for attempt_throttle, key in throttle_checks)
+    if retry_after:
+        st.session_state["verify_message"] = ("error", f"Too many failed attempts. Please try again in {int(retry_after // 60) + 1} minute(s).")
+        return
+
     # COURTS PORTAL 
-    if ("@courts.mo.gov" in st.session_state["verified_email"] or ("@jacksongov.org" in st.session_state["verified_email"])) and (st.session_state["security_code"] == st.secrets["security_codes"]["court"]):
-        external_log_activity(db_connection, "courts_log", st.session_state["verified_email"], st.context.ip_address)
-        success_message = st.success(f"{st.session_state['verified_email']} successfully verified.")
-        time.sleep(2)
-        success_message.empty()
+    if is_court_email(verified_email) and hmac.compare_digest(str(st.session_state["security_code"] or ""), str(st.secrets["security_codes"]["court"])):
+        try:
+            db_connection = get_db_connection()
+        except Exception as e:
+            print(f"{e}")
+            st.session_state["verify_message"] = ("error", "The directory is temporarily unavailable. Please try again shortly.")
+            return
+        from audit_log import get_audit_log_writer
+        get_audit_log_writer(db_connection).log("courts_log", verified_email, st.context.ip_address) # Batched in the background
+        reset_attempts(verified_email)
         st.session_state["verified"] = True
+        st.session_state["verified_user"] = verified_email
+        grant_access_token(verified_email) # Logged once per token; reloads until it expires skip the portal
+        st.toast(f"{verified_email} successfully verified.", icon=":material/check_circle:")
     else:
-        fail_message = st.error("Failed to verify user. Please try again with an authorized email and security code.")
-        time.sleep(2)
-        fail_message.empty()
+        for attempt_throttle, key in throttle_checks:
+            attempt_throttle.record_failure(key)
+        # Shown on the next rerun and cleared after (no blocking sleep on the script thread)
+        st.session_state["verify_message"] = ("error", "Failed to verify user. Please try again with an authorized email and security code.")
 
 
 # --- Verification Portal --- 
@@ -97,14 +124,18 @@ def display_verification_portal():
         with st.container(border=True):
 
             # Display JCPAO logo
-            jcpao_logo = load_photo("jcpao_logo_200x200")
-            st.markdown(f"<img src='{jcpao_logo}' width='200' style='display: block; margin: 0 auto;'>", unsafe_allow_html=True)
+            st.markdown(logo_img_tag(200, lazy=False, style="display: block; margin: 0 auto; width: 200px;"), unsafe_allow_html=True)
 
             # Display center title: JCPAO Portal
             st.markdown("<h1 style='text-align: center; color: black;'>JCPAO APA Directory (Courts)</h1>", unsafe_allow_html=True)
             
             st.divider()
 
+            # Verification feedback from the last attempt (shown once)
+            verify_message = st.session_state.pop("verify_message", None)
+            if verify_message is not None:
+                st.error(verify_message[1])
+
             # Verification form
             with st.form("verify_court"):
                 st.subheader(":material/gavel: 16th Circuit Court of Jackson County, Missouri")
@@ -146,10 +177,16 @@ if not st.session_state["verified"]:
     display_verification_portal()
 
 else:
+    keep_access_token()
+
     # Display APA Directory 
     court_pages = [
         st.Page("court_view.py", title="JCPAO Attorney Directory", icon=":material/contact_page:"),
     ]
+    if metrics.is_metrics_admin(st.session_state["verified_user"]):
+        court_pages.append(st.Page("admin_metrics.py", title="Directory Metrics", icon=":material/monitoring:"))
 
     court_pg = st.navigation(court_pages)
-    court_pg.run()
\ No newline at end of file
+    court_pg.run()
+
+metrics.record("rerun.total", time.perf_counter() - rerun_start)
\ No newline at end of file
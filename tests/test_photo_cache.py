@@ -0,0 +1,130 @@
+"""
+File: tests/test_photo_cache.py
+Function: PhotoCache against a local HTTP server -- ETag revalidation, LRU eviction, per-host circuit breaker
+"""
+
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from photo_cache import PhotoCache
+
+
+IMAGES = {f"/img{i}.jpg": bytes([i]) * 1000 for i in range(4)}
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves IMAGES with an ETag per path; answers a matching If-None-Match with 304"""
+
+    requests = [] # (path, If-None-Match header)
+
+    def do_GET(self):
+        ImageHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        body = IMAGES.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        etag = f'"{self.path}-v1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    ImageHandler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def closed_port():
+    """Base URL of a local port nothing listens on (connections are refused)"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def test_stale_entry_revalidates_with_if_none_match(server, tmp_path):
+    cache = PhotoCache(tmp_path, revalidate_after=0.0, timeout=2.0)
+
+    assert cache.get(f"{server}/img1.jpg") == IMAGES["/img1.jpg"]
+    assert cache.get(f"{server}/img1.jpg") == IMAGES["/img1.jpg"]
+
+    assert ImageHandler.requests == [("/img1.jpg", None), ("/img1.jpg", '"/img1.jpg-v1"')]
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["revalidated"] == 1
+    assert "refreshed" not in stats
+
+
+def test_immutable_entry_is_served_without_a_request(server, tmp_path):
+    cache = PhotoCache(tmp_path, revalidate_after=0.0, timeout=2.0)
+
+    cache.get(f"{server}/img1.jpg", immutable=True)
+    assert cache.get(f"{server}/img1.jpg", immutable=True) == IMAGES["/img1.jpg"]
+
+    assert len(ImageHandler.requests) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(server, tmp_path):
+    cache = PhotoCache(tmp_path, max_bytes=2500, timeout=2.0) # Room for two 1000-byte images
+
+    cache.get(f"{server}/img0.jpg")
+    cache.get(f"{server}/img1.jpg")
+    cache.get(f"{server}/img0.jpg") # img1 is now the least recently used
+    cache.get(f"{server}/img2.jpg")
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2 and stats["bytes"] <= 2500
+    assert len(list(tmp_path.glob("[0-9a-f]" * 64))) == 2
+
+    ImageHandler.requests = []
+    cache.get(f"{server}/img0.jpg")
+    assert ImageHandler.requests == [] # Still cached
+    cache.get(f"{server}/img1.jpg")
+    assert ImageHandler.requests == [("/img1.jpg", None)] # Evicted: fetched again
+
+
+def test_unreachable_host_is_skipped_once_its_circuit_opens(closed_port, tmp_path):
+    cache = PhotoCache(tmp_path, timeout=2.0, failure_threshold=2, backoff=60.0)
+
+    for i in range(2):
+        assert cache.get(f"{closed_port}/img{i}.jpg") is None
+    assert cache.stats()["errors"] == 2
+    assert "skipped" not in cache.stats()
+
+    for i in range(3):
+        assert cache.get(f"{closed_port}/img{i}.jpg") is None
+    stats = cache.stats()
+    assert stats["skipped"] == 3
+    assert stats["errors"] == 2 # No further connection attempts while the circuit is open
+
+
+def test_open_circuit_is_per_host(server, closed_port, tmp_path):
+    cache = PhotoCache(tmp_path, timeout=2.0, failure_threshold=1, backoff=60.0)
+
+    assert cache.get(f"{closed_port}/img1.jpg") is None
+    assert cache.get(f"{server}/img1.jpg") == IMAGES["/img1.jpg"]
+    assert cache.get(f"{closed_port}/img2.jpg") is None
+
+    stats = cache.stats()
+    assert stats["skipped"] == 1 and stats["misses"] == 1
@@ -0,0 +1,125 @@
+"""
+File: throttle.py
+Function: In-memory, per-email + per-domain (and optionally per-IP) throttle for failed verification attempts
+
+Configured under [throttle] in secrets.toml:
+    max_failures = 5               # failures per email within `window` seconds before it is blocked
+    window = 300
+    domain_max_failures = 100      # failure budget per email domain (all court users share it); 0 = off
+    ip_max_failures = 0            # separate, much higher per-IP limit; 0 = off (default)
+
+The per-email limit alone is no limit on guessing the shared security code (any address on a court domain passes
+the domain check, so a new email per guess gets a fresh budget); the per-domain budget caps those guesses, and is
+set high so ordinary typos across every court user never reach it. It is not reset by a successful verification.
+The per-IP limit is off by default: st.context.ip_address is the load balancer's (or courthouse NAT's) address
+rather than the user's, so one IP key would lock out every court user at once.
+"""
+
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+
+class AttemptThrottle:
+    """Sliding-window failure counter; a key with `max_failures` failures within `window` seconds is blocked
+    until its oldest failure ages out. Checks are dictionary lookups -- no secrets comparison, no database."""
+
+    def __init__(self, max_failures=5, window=300.0, max_keys=10000):
+        self.max_failures = max_failures
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._failures = {} # key -> deque of failure timestamps (monotonic)
+
+    def _recent(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and now - failures[0] >= self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, *keys):
+        """Seconds until the most-restricted of `keys` may try again (0 if none are blocked)"""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for key in keys:
+                failures = self._recent(key, now)
+                if failures is not None and len(failures) >= self.max_failures:
+                    wait = max(wait, self.window - (now - failures[-self.max_failures]))
+        return wait
+
+    def record_failure(self, *keys):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._failures) >= self.max_keys:
+                for key in list(self._failures):
+                    self._recent(key, now) # Prune expired keys so memory stays bounded
+            for key in keys:
+                failures = self._recent(key, now)
+                if failures is None:
+                    failures = self._failures[key] = deque(maxlen=self.max_failures)
+                failures.append(now)
+
+    def reset(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._failures.pop(key, None)
+
+
+# Define get_attempt_throttle()
+@st.cache_resource
+def get_attempt_throttle():
+    """Process-wide per-email AttemptThrottle; limits are configurable under [throttle] in secrets.toml"""
+    throttle_config = st.secrets.get("throttle", {})
+    return AttemptThrottle(
+        max_failures=throttle_config.get("max_failures", 5),
+        window=throttle_config.get("window", 300.0),
+    )
+
+# Define get_domain_throttle()
+@st.cache_resource
+def get_domain_throttle():
+    """Process-wide per-email-domain AttemptThrottle (high limit), or None when [throttle] domain_max_failures is 0"""
+    throttle_config = st.secrets.get("throttle", {})
+    if not throttle_config.get("domain_max_failures", 100):
+        return None
+    return AttemptThrottle(
+        max_failures=throttle_config.get("domain_max_failures", 100),
+        window=throttle_config.get("window", 300.0),
+    )
+
+# Define get_ip_throttle()
+@st.cache_resource
+def get_ip_throttle():
+    """Process-wide per-IP AttemptThrottle with its own (higher) limit, or None when [throttle] ip_max_failures is 0"""
+    throttle_config = st.secrets.get("throttle", {})
+    if not throttle_config.get("ip_max_failures", 0):
+        return None
+    return AttemptThrottle(
+        max_failures=throttle_config["ip_max_failures"],
+        window=throttle_config.get("window", 300.0),
+    )
+
+# Define attempt_checks()
+def attempt_checks(email, ip_address):
+    """[(throttle, key)] that apply to a verification attempt"""
+    checks = [(get_attempt_throttle(), f"email:{email.lower()}")]
+    domain_throttle = get_domain_throttle()
+    if domain_throttle is not None:
+        checks.append((domain_throttle, f"domain:{email.rsplit('@', 1)[-1].lower()}"))
+    ip_throttle = get_ip_throttle()
+    if ip_throttle is not None and ip_address: # None when running locally
+        checks.append((ip_throttle, f"ip:{ip_address}"))
+    return checks
+
+# Define reset_attempts()
+def reset_attempts(email):
+    """Clear an email's failures after it verifies (shared domain / IP budgets are left to age out)"""
+    get_attempt_throttle().reset(f"email:{email.lower()}")
@@ -0,0 +1,120 @@
+"""
+File: warmup.py
+Function: Cold-start warmup for a fresh server process -- opens the connection pool (waking a suspended Neon
+          compute), loads and prepares the roster snapshot and resolves logo/headshot URLs in a background thread
+
+Streamlit has no server-boot hook, so the warmup starts on the first script run of the process and never blocks
+it: the verification portal renders right away while the directory warms up behind it. Configured under
+[warmup] in secrets.toml:
+    enabled = true                 # default
+"""
+
+import threading
+import time
+
+import streamlit as st
+from streamlit.logger import get_logger
+
+import metrics
+
+
+# Streamlit-configured logger (handler + logger.level), so the cold-start summary is reported even with metrics off
+logger = get_logger("court_directory.warmup")
+
+
+class Warmup:
+    """Runs the warmup stages once, in order, recording each stage's duration (and failure) as cold-start timings"""
+
+    STAGES = ("imports", "pool", "roster", "assets")
+
+    def __init__(self, database_url):
+        self.database_url = database_url
+        self.timings = {} # stage -> seconds
+        self.errors = {} # stage -> error message
+        self._done = threading.Event()
+        self._connection_pool = None
+        self._directory_frame = None
+
+    def start(self):
+        threading.Thread(target=self.run, name="directory-warmup", daemon=True).start()
+        return self
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            for stage in self.STAGES:
+                stage_start = time.perf_counter()
+                try:
+                    getattr(self, f"_warm_{stage}")()
+                except Exception as e:
+                    self.errors[stage] = str(e)
+                    logger.warning(f"Warmup stage {stage!r} failed: {e}")
+                self.timings[stage] = time.perf_counter() - stage_start
+                metrics.record(f"warmup.{stage}", self.timings[stage])
+            self.timings["total"] = time.perf_counter() - start
+            metrics.record("warmup.total", self.timings["total"])
+            logger.info("Cold-start warmup finished: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in self.timings.items()))
+        finally:
+            self._done.set()
+
+    # Court view dependencies the verification portal does not import (pandas, psycopg2, cloudinary, ...)
+    def _warm_imports(self):
+        import database, directory, directory_sql, exports, headshots, photo # noqa: F401
+
+    # Opens min_size connections (wakes the Neon compute if it was suspended)
+    def _warm_pool(self):
+        from database import get_database_session
+        self._connection_pool = get_database_session(self.database_url)
+
+    # Roster load + display-ready snapshot (memory mode) / first unfiltered query (SQL mode)
+    def _warm_roster(self):
+        if self._connection_pool is None:
+            raise RuntimeError("no connection pool")
+        if st.secrets.get("directory", {}).get("query_mode", "memory") == "sql":
+            from directory import query_directory
+            from directory_sql import get_directory_query
+            self._directory_frame = query_directory(get_directory_query(self._connection_pool))
+        else:
+            from directory import get_directory_snapshot
+            directory_snapshot = get_directory_snapshot(self._connection_pool)
+            if directory_snapshot is None:
+                raise RuntimeError("roster could not be loaded")
+            self._directory_frame = directory_snapshot.data
+
+    # Static branding manifest, headshot manifest sync + memoized (versioned) Cloudinary URLs for every headshot; opens the local photo cache
+    def _warm_assets(self):
+        from branding import load_manifest
+        from headshots import get_headshot_manifest, headshot_public_id
+        from photo import HEADSHOT_WIDTH, get_photo_cache, photo_img_tag
+        load_manifest()
+        headshot_manifest = get_headshot_manifest()
+        if headshot_manifest is not None and headshot_manifest.is_stale():
+            headshot_manifest.sync()
+        if self._directory_frame is not None and 'PhotoID' in self._directory_frame:
+            for photo_id in self._directory_frame['PhotoID'].dropna().unique():
+                public_id = headshot_public_id(photo_id)
+                entry = headshot_manifest.get(public_id) if headshot_manifest is not None else None
+                photo_img_tag(public_id, HEADSHOT_WIDTH, version=entry["version"] if entry else None)
+        get_photo_cache()
+
+    def wait(self, timeout=None):
+        """Block until the warmup has finished (True) or `timeout` seconds passed (False)"""
+        return self._done.wait(timeout)
+
+    def stats(self):
+        """Stage durations in ms (metrics collector)"""
+        stats = {f"{stage}_ms": seconds * 1000 for stage, seconds in self.timings.items()}
+        stats["done"] = int(self._done.is_set())
+        stats["failed_stages"] = len(self.errors)
+        return stats
+
+
+# Define start_warmup()
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """Start the process's warmup once (first script run); returns the Warmup, or None when disabled"""
+    if not st.secrets.get("warmup", {}).get("enabled", True):
+        return None
+    warmup = Warmup(st.secrets["neonDB"]["database_url"])
+    metrics.register_collector("warmup", warmup.stats)
+    return warmup.start()